@@ -0,0 +1,47 @@
+import argparse
+import time
+from pathlib import Path
+from gif_decoder import GifDecoder
+
+DEFAULT_GIF = Path(__file__).resolve().parent.parent / 'test_gifs' / '20fps.gif'
+
+def decode_with_gif_decoder(path: Path) -> int:
+    return sum(len(frame.indices) for frame in GifDecoder(path).frames())
+
+def decode_with_pillow(path: Path) -> int:
+    from PIL import Image, ImageSequence
+    pixels = 0
+    with Image.open(path) as image:
+        for frame in ImageSequence.Iterator(image):
+            frame.load()
+            pixels += frame.width * frame.height
+    return pixels
+
+def best_time(func, path: Path, repeat: int) -> tuple[float, int]:
+    best = float('inf')
+    pixels = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pixels = func(path)
+        best = min(best, time.perf_counter() - start)
+    return best, pixels
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark GifDecoder against Pillow')
+    parser.add_argument('file', type=Path, nargs='?', default=DEFAULT_GIF, help='GIF file to decode')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Number of runs, the best one is reported')
+    args = parser.parse_args()
+    
+    decoders = [('gif_decoder', decode_with_gif_decoder)]
+    try:
+        import PIL
+        decoders.append(('pillow', decode_with_pillow))
+    except ImportError:
+        print("Pillow is not installed, skipping the comparison")
+    
+    for name, func in decoders:
+        seconds, pixels = best_time(func, args.file, args.repeat)
+        print(f"{name:12} {seconds * 1000:8.2f} ms  {pixels / seconds / 1e6:8.2f} Mpx/s")
+
+if __name__ == "__main__":
+    main()
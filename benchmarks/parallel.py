@@ -0,0 +1,48 @@
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from gif_compositor import GifCompositor
+from gif_parallel import ParallelDecoder
+from benchmarks.synthetic import synthetic_gif
+
+def composite_serial(path: Path) -> np.ndarray | None:
+    last = None
+    for composited in GifCompositor(path).frames():
+        last = composited.canvas
+    return last
+
+def composite_parallel(path: Path, workers: int) -> np.ndarray | None:
+    last = None
+    for composited in ParallelDecoder(path, workers).frames():
+        last = composited.canvas
+    return last
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure parallel frame decoding speedup against worker count')
+    parser.add_argument('--frames', type=int, default=400, help='Frames in the synthetic GIF')
+    parser.add_argument('--size', type=int, default=160, help='Width and height of the synthetic GIF')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help='Largest worker count to measure')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'synthetic.gif'
+        path.write_bytes(synthetic_gif(args.frames, args.size, args.size))
+        print(f"{args.frames} frames of {args.size}x{args.size}, {path.stat().st_size / 1e6:.1f} MB")
+        
+        start = time.perf_counter()
+        expected = composite_serial(path)
+        serial = time.perf_counter() - start
+        print(f"{'serial':>8} {serial:8.2f} s  {args.frames / serial:8.1f} frames/s")
+        
+        for workers in range(1, args.max_workers + 1):
+            start = time.perf_counter()
+            result = composite_parallel(path, workers)
+            seconds = time.perf_counter() - start
+            assert np.array_equal(result, expected), "parallel result differs from the serial one"
+            print(f"{workers:>8} {seconds:8.2f} s  {args.frames / seconds:8.1f} frames/s  {serial / seconds:5.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import argparse
+import io
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+from gif_compositor import GifCompositor
+from gif_decoder import GifDecoder
+from gif_optimizer import GifOptimizer
+from gif_parser import GifParser
+from benchmarks.synthetic import CASES, write_cases
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baselines.json'
+
+def parse(path: Path) -> int:
+    return GifParser(path).parse_file()['frame_count']
+
+def decode(path: Path) -> int:
+    return sum(1 for _ in GifDecoder(path).frames())
+
+def render(path: Path) -> int:
+    return sum(1 for _ in GifCompositor(path).frames())
+
+def preview(path: Path) -> int:
+    return sum(1 for _ in GifCompositor(path, max_size=160).frames())
+
+def optimize(path: Path) -> int:
+    return GifOptimizer(path).optimize(io.BytesIO()).input_frames
+
+STAGES: dict[str, Callable[[Path], int]] = {
+    'parse': parse,
+    'decode': decode,
+    'render': render,
+    'preview': preview,
+    'optimize': optimize
+}
+
+def measure(func: Callable[[Path], int], path: Path, repeat: int) -> dict[str, float]:
+    best = float('inf')
+    frames = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = func(path)
+        best = min(best, time.perf_counter() - start)
+    
+    # Peak memory comes from a separate traced run so tracing does not skew the timings
+    tracemalloc.start()
+    try:
+        func(path)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    
+    size = path.stat().st_size
+    return {
+        'seconds': round(best, 6),
+        'mb_per_s': round(size / best / 1e6, 3),
+        'frames_per_s': round(frames / best, 3),
+        'peak_mb': round(peak / 1e6, 3)
+    }
+
+def compare(result: dict[str, float], baseline: dict[str, float] | None) -> str:
+    if not baseline:
+        return ''
+    change = result['mb_per_s'] / baseline['mb_per_s'] - 1
+    return f"{change:+7.1%}"
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parsing, decoding, rendering, previewing and optimizing on synthetic worst-case GIFs')
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES), help='Cases to run (default: all)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES), help='Stages to run (default: all)')
+    parser.add_argument('--scale', type=float, default=0.1, help='Multiplier for frame counts and extension sizes (default: 0.1)')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of timed runs, the best one is reported')
+    parser.add_argument('--data-dir', type=Path, help='Keep the generated GIFs in this directory')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='Baseline file to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline')
+    parser.add_argument('--max-regression', type=float, help='Exit with 1 if throughput drops by more than this fraction')
+    args = parser.parse_args()
+    
+    baselines = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if baselines.get('scale', args.scale) != args.scale:
+        print(f"Baseline was recorded at scale {baselines['scale']}, not comparing")
+        baselines = {}
+    stored = baselines.get('results', {})
+    
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    regressions = missing = 0
+    
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_cases(args.data_dir or Path(directory), args.scale, args.cases)
+        print(f"{'case':20} {'stage':8} {'MB/s':>10} {'frames/s':>12} {'peak MB':>9} {'vs base':>8}")
+        
+        for name, path in paths.items():
+            for stage in args.stages:
+                result = measure(STAGES[stage], path, args.repeat)
+                results.setdefault(name, {})[stage] = result
+                baseline = stored.get(name, {}).get(stage)
+                print(f"{name:20} {stage:8} {result['mb_per_s']:10.2f} {result['frames_per_s']:12.1f} "
+                      f"{result['peak_mb']:9.1f} {compare(result, baseline):>8}")
+                if args.max_regression is not None and not baseline:
+                    missing += 1
+                elif args.max_regression is not None and result['mb_per_s'] < baseline['mb_per_s'] * (1 - args.max_regression):
+                    regressions += 1
+    
+    if args.save_baseline:
+        # Cases and stages that were not run keep their stored baseline
+        for name, stages in results.items():
+            stored.setdefault(name, {}).update(stages)
+        args.baseline.write_text(json.dumps({
+            'scale': args.scale,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'results': stored
+        }, indent=2) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+    if missing:
+        print(f"{missing} measurements have no baseline to compare against")
+    if regressions:
+        print(f"{regressions} measurements regressed by more than {args.max_regression:.0%}")
+        exit(1)
+
+if __name__ == "__main__":
+    main()
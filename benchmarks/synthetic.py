@@ -0,0 +1,85 @@
+import struct
+from pathlib import Path
+import numpy as np
+
+# A clear code before every run of literals keeps the code size at min_code_size + 1
+LITERALS_PER_CLEAR = 254
+
+def lzw_literals(indices: bytes | np.ndarray, min_code_size: int = 8) -> bytes:
+    clear_code = 1 << min_code_size
+    pixels = np.frombuffer(indices, np.uint8).astype(np.uint16)
+    runs = -(-len(pixels) // LITERALS_PER_CLEAR)
+    
+    codes = np.full(len(pixels) + runs + 1, clear_code, np.uint16)
+    positions = np.arange(len(pixels))
+    codes[positions + positions // LITERALS_PER_CLEAR + 1] = pixels
+    codes[-1] = clear_code + 1
+    
+    code_size = min_code_size + 1
+    bits = ((codes[:, None] >> np.arange(code_size, dtype=np.uint16)) & 1).astype(np.uint8)
+    return np.packbits(bits.ravel(), bitorder='little').tobytes()
+
+def sub_blocks(data: bytes, size: int = 255) -> bytes:
+    # Full blocks are laid out with NumPy, followed by a shorter last block and the terminator
+    whole = len(data) // size * size
+    blocks = np.empty((whole // size, size + 1), np.uint8)
+    blocks[:, 0] = size
+    blocks[:, 1:] = np.frombuffer(data, np.uint8, whole).reshape(-1, size)
+    tail = data[whole:]
+    return blocks.tobytes() + (bytes((len(tail),)) + tail if tail else b'') + b'\x00'
+
+def synthetic_gif(frames: int, width: int, height: int, seed: int = 0, delay: int = 4,
+                  local_color_tables: bool = False, sub_block_size: int = 255,
+                  comment_size: int = 0, application_size: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    out = bytearray(b'GIF89a')
+    out += struct.pack('<HHBBB', width, height, 0b11110111, 0, 0)
+    out += rng.integers(0, 256, 768, np.uint8).tobytes()
+    out += b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00'
+    
+    if application_size:
+        out += b'\x21\xff\x0bXMP DataXMP'
+        out += sub_blocks(rng.integers(32, 127, application_size, np.uint8).tobytes())
+    if comment_size:
+        out += b'\x21\xfe'
+        out += sub_blocks(rng.integers(32, 127, comment_size, np.uint8).tobytes())
+    
+    for _ in range(frames):
+        out += struct.pack('<BBBBHBB', 0x21, 0xF9, 4, 0b00000100, delay, 0, 0)
+        if local_color_tables:
+            out += struct.pack('<BHHHHB', 0x2C, 0, 0, width, height, 0b10000111)
+            out += rng.integers(0, 256, 768, np.uint8).tobytes()
+        else:
+            out += struct.pack('<BHHHHB', 0x2C, 0, 0, width, height, 0)
+        out.append(8)
+        out += sub_blocks(lzw_literals(rng.integers(0, 256, width * height, np.uint8)), sub_block_size)
+    
+    out.append(0x3B)
+    return bytes(out)
+
+# Worst cases for the parser, decoder and compositor; sizes are multiplied by the scale
+CASES: dict[str, dict[str, int | bool]] = {
+    'many_frames': {'frames': 20000, 'width': 8, 'height': 8},
+    'local_color_tables': {'frames': 2000, 'width': 32, 'height': 32, 'local_color_tables': True},
+    'giant_extensions': {'frames': 4, 'width': 64, 'height': 64, 'comment_size': 16 << 20, 'application_size': 16 << 20},
+    'tiny_sub_blocks': {'frames': 50, 'width': 128, 'height': 128, 'sub_block_size': 1},
+    'large_canvas': {'frames': 1, 'width': 2048, 'height': 2048}
+}
+
+SCALED = ('frames', 'comment_size', 'application_size')
+
+def case_options(name: str, scale: float = 1.0) -> dict[str, int | bool]:
+    options = dict(CASES[name])
+    for key in SCALED:
+        if key in options:
+            options[key] = max(1, int(options[key] * scale))
+    return options
+
+def write_cases(directory: Path, scale: float = 1.0, names: list[str] | None = None) -> dict[str, Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for name in names or CASES:
+        path = directory / f"{name}.gif"
+        path.write_bytes(synthetic_gif(**case_options(name, scale)))
+        paths[name] = path
+    return paths
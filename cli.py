@@ -1,42 +1,556 @@
 import argparse
+import cProfile
+import glob
+import json
+import os
+import pstats
+import sys
+import tarfile
+import time
+import zipfile
+from contextlib import nullcontext
+from itertools import chain, islice
+from multiprocessing import Pool
 from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator
+from gif_archive import archive_kind, iter_tar_members, member_path, open_member, split_member, zip_members
+from gif_cache import AnalysisCache, CACHE_DIR_ENV
+from gif_index import FrameIndex
 from gif_parser import GifParser
+from gif_report import WRITERS, report_dict
+
+GLOB_CHARS = set('*?[')
+STDIN = Path('-')
+# Per-request options accepted by --serve-stdio, defaulting to the command line flags
+SERVE_OPTIONS = ('summary', 'colors', 'diff', 'refresh', 'max_frames', 'max_bytes', 'deadline')
+
+_cache: AnalysisCache | None = None
+_refresh: bool = False
+_stats: bool = False
+_scan: dict[str, int | float | None] | None = None
+_colors: bool = False
+_diff: bool = False
+# The --serve-stdio cache lives for the whole process; per-request worker state never touches it
+_serve_cache: AnalysisCache | None = None
+
+def init_server(cache: AnalysisCache | None) -> None:
+    global _serve_cache
+    _serve_cache = cache
+
+def init_worker(cache: AnalysisCache | None, refresh: bool, stats: bool = False,
+                scan: dict[str, int | float | None] | None = None, colors: bool = False, diff: bool = False) -> None:
+    global _cache, _refresh, _stats, _scan, _colors, _diff
+    _cache, _refresh, _stats, _scan, _colors, _diff = cache, refresh, stats, scan, colors, diff
+
+def color_stats(source: Path | bytes) -> dict:
+    # NumPy is only needed for color statistics, so it is imported on demand
+    from gif_colors import ColorStats
+    return ColorStats(source).analyze().summary()
+
+def frame_diff(source: Path | bytes) -> dict:
+    from gif_diagnostics import FrameDiagnostics
+    return FrameDiagnostics(source).analyze().summary()
+
+def expand_paths(patterns: Iterable[str]) -> Iterator[Path]:
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob('*') if p.suffix.lower() == '.gif' and p.is_file())
+        elif GLOB_CHARS.intersection(pattern):
+            for match in sorted(glob.iglob(pattern, recursive=True)):
+                match_path = Path(match)
+                if match_path.is_file():
+                    yield match_path
+        else:
+            yield path
+
+def expand_archives(paths: Iterable[Path], tars: list[Path], errors: list[tuple[Path, str]]) -> Iterator[Path]:
+    # Zip members are handed to the workers one by one, each opening the archive itself;
+    # tars can only be read front to back, so they are collected for the caller to stream through
+    for path in paths:
+        kind = archive_kind(path)
+        if kind == 'zip':
+            try:
+                yield from [member_path(path, name) for name in zip_members(path)]
+            except (OSError, zipfile.BadZipFile) as e:
+                errors.append((path, str(e)))
+        elif kind == 'tar':
+            tars.append(path)
+        else:
+            yield path
+
+def reject_archives(paths: list[Path]) -> None:
+    archives = [str(path) for path in paths if archive_kind(path) or split_member(path)]
+    if archives:
+        print(f"Error: archives are not supported here, extract them first: {', '.join(archives)}", file=sys.stderr)
+        exit(1)
+
+def analyze_stream(path: Path, stream: BinaryIO) -> tuple[Path, GifParser | dict, None, bool]:
+    # Stdin and archive members are read once, front to back, and never cached
+    if _scan is not None:
+        return path, GifParser().scan_stream(stream, **_scan), None, False
+    gif_parser = GifParser(stats=_stats)
+    if _colors or _diff:
+        data = stream.read()
+        gif_parser.parse_bytes(data)
+        if _colors:
+            gif_parser.colors = color_stats(data)
+        if _diff:
+            gif_parser.diff = frame_diff(data)
+    else:
+        gif_parser.parse_stream(stream)
+    return path, gif_parser, None, False
+
+def analyze_file(path: Path, use_cache: bool = True) -> tuple[Path, GifParser | dict | None, str | None, bool]:
+    try:
+        if path == STDIN:
+            return analyze_stream(path, sys.stdin.buffer)
+        member = split_member(path) if not path.exists() else None
+        if member is not None:
+            with open_member(*member) as stream:
+                return analyze_stream(path, stream)
+        if _scan is not None:
+            return path, GifParser(path).scan(**_scan), None, False
+        if use_cache and _cache is not None:
+            gif_parser, cached = _cache.analyze(path, _refresh, _stats)
+        else:
+            gif_parser, cached = GifParser(path, stats=_stats), False
+            gif_parser.parse_file()
+        if _colors:
+            gif_parser.colors = color_stats(path)
+        if _diff:
+            gif_parser.diff = frame_diff(path)
+        return path, gif_parser, None, cached
+    except Exception as e:
+        return path, None, str(e), False
+
+def pool_chunksize(chunksize: int, tasks: int, jobs: int) -> int:
+    # Small batches are cut into smaller chunks, so every worker still gets several of them
+    return max(1, min(chunksize, tasks // (jobs * 4) if jobs else 1))
+
+def analyze_files(paths: list[Path], jobs: int, chunksize: int = 1, cache: AnalysisCache | None = None,
+                  refresh: bool = False, stats: bool = False,
+                  scan: dict[str, int | float | None] | None = None,
+                  colors: bool = False, diff: bool = False) -> Iterator[tuple[Path, GifParser | dict | None, str | None, bool]]:
+    init_worker(cache, refresh, stats, scan, colors, diff)
+    if STDIN in paths:
+        yield analyze_file(STDIN)
+        paths = [path for path in paths if path != STDIN]
+    
+    tars, errors = [], []
+    tasks = list(expand_archives(paths, tars, errors))
+    for path, error in errors:
+        yield path, None, error, False
+    
+    # Sized after expansion, so a single archive still spreads its members over the workers
+    jobs = min(jobs, len(tasks))
+    chunksize = pool_chunksize(chunksize, len(tasks), jobs)
+    with Pool(jobs, init_worker, (cache, refresh, stats, scan, colors, diff)) if jobs > 1 else nullcontext() as pool:
+        results = pool.imap_unordered(analyze_file, tasks, chunksize) if pool else map(analyze_file, tasks)
+        for tar in tars:
+            yield from analyze_tar(tar)
+        yield from results
+
+def analyze_tar(archive: Path) -> Iterator[tuple[Path, GifParser | dict | None, str | None, bool]]:
+    # A damaged archive ends the walk, reported on the member being read or on the archive itself
+    path = archive
+    try:
+        for name, stream in iter_tar_members(archive):
+            path = member_path(archive, name)
+            try:
+                result = analyze_stream(path, stream)
+            except (OSError, tarfile.TarError):
+                raise
+            except Exception as e:
+                result = path, None, str(e), False
+            yield result
+            path = archive
+    except (OSError, tarfile.TarError) as e:
+        yield path, None, str(e), False
+
+def format_stats(path: Path, gif_parser: GifParser, cached: bool) -> str:
+    stats = gif_parser.stats
+    if stats is None:
+        return f"{path}: reused from the cache, no stats collected" if cached else f"{path}: no stats collected"
+    extensions = ', '.join(f"{name} {count}" for name, count in sorted(stats.extensions.items())) or 'none'
+    timings = ', '.join(f"{phase} {seconds * 1000:.2f} ms" for phase, seconds in stats.timings.items())
+    return (f"{path}: {stats.bytes_read} bytes in {stats.read_calls} reads, {stats.sub_blocks} sub-blocks, "
+            f"{stats.images} images, extensions: {extensions}\n  {timings}")
+
+def parse_request(seq: int, line: str, defaults: dict) -> dict:
+    # A request line is a bare path or a JSON object with a path and any of SERVE_OPTIONS
+    line = line.strip()
+    if not line.startswith('{'):
+        return {'id': seq, 'path': line, **defaults}
+    request = json.loads(line)
+    if not isinstance(request, dict) or not isinstance(request.get('path'), str):
+        raise ValueError("request needs a path")
+    unknown = set(request) - {'id', 'path', *SERVE_OPTIONS}
+    if unknown:
+        raise ValueError(f"unknown request fields: {', '.join(sorted(unknown))}")
+    return {**defaults, 'id': seq, **request}
+
+def serve_request(task: tuple[int, str, dict]) -> str:
+    seq, line, defaults = task
+    start = time.perf_counter()
+    try:
+        request = parse_request(seq, line, defaults)
+    except ValueError as e:
+        return json.dumps({'id': seq, 'error': f"bad request: {e}"})
+    
+    path = Path(request['path'])
+    scan = {key: request[key] for key in ('max_frames', 'max_bytes', 'deadline')} if request['summary'] else None
+    # Worker state is reset for every request; the cache and imported modules stay warm
+    init_worker(_serve_cache, request['refresh'], False, scan, request['colors'], request['diff'])
+    if path == STDIN:
+        path, result, error, cached = path, None, "stdin is the request stream", False
+    else:
+        # Summaries are cheaper to compute than to look up, so they bypass the cache
+        path, result, error, cached = analyze_file(path, not request['summary'])
+    
+    response = {'id': request['id'], 'path': str(path)}
+    if error is not None:
+        response['error'] = error
+    elif scan is not None:
+        response.update(result)
+    else:
+        response.update(report_dict(result))
+    response['cached'] = cached
+    response['seconds'] = round(time.perf_counter() - start, 6)
+    return json.dumps(response)
+
+def serve(args: argparse.Namespace) -> None:
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    cache = AnalysisCache(args.cache_dir, hash_content=args.cache_hash) if args.cache_dir and not args.no_cache else None
+    defaults = {
+        'summary': args.summary, 'colors': args.colors, 'diff': args.diff, 'refresh': args.refresh,
+        'max_frames': args.max_frames, 'max_bytes': args.max_bytes, 'deadline': args.deadline
+    }
+    init_server(cache)
+    # Lines are read as they arrive, so a result goes out while the orchestrator is still writing requests
+    tasks = ((seq, line, defaults) for seq, line in enumerate(sys.stdin, 1) if line.strip())
+    out = sys.stdout
+    try:
+        with Pool(jobs, init_server, (cache,)) if jobs > 1 else nullcontext() as pool:
+            if pool is None:
+                results = map(serve_request, tasks)
+            elif args.ordered:
+                results = pool.imap(serve_request, tasks)
+            else:
+                results = pool.imap_unordered(serve_request, tasks)
+            for line in results:
+                out.write(line)
+                out.write("\n")
+                out.flush()
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+    finally:
+        if cache is not None:
+            cache.evict()
+            cache.close()
+
+def optimized_path(path: Path, output: Path | None, batch: bool) -> Path:
+    if output is None:
+        return path.with_name(f"{path.stem}.optimized.gif")
+    return output / path.name if batch or output.is_dir() else output
+
+def optimize(argv: list[str]) -> None:
+    from gif_optimizer import GifOptimizer
+    parser = argparse.ArgumentParser(prog='cli.py optimize', description='Write smaller GIFs: frames cropped to the pixels that change, duplicate frames merged, metadata blocks dropped and redundant local color tables replaced by the global one')
+    parser.add_argument('paths', nargs='+', metavar='path', help='GIF files, directories (searched recursively) or glob patterns')
+    parser.add_argument('-o', '--output', type=Path, help='Output file, or directory when optimizing several files (default: NAME.optimized.gif next to each input)')
+    args = parser.parse_args(argv)
+    
+    paths = list(dict.fromkeys(expand_paths(args.paths)))
+    if not paths:
+        print("Error: no GIF files found")
+        exit(1)
+    reject_archives(paths)
+    batch = len(paths) > 1
+    if batch and args.output:
+        args.output.mkdir(parents=True, exist_ok=True)
+    
+    failed = 0
+    for path in paths:
+        output = optimized_path(path, args.output, batch)
+        try:
+            if output.resolve() == path.resolve():
+                raise ValueError("output would overwrite the input")
+            with output.open('wb') as f:
+                result = GifOptimizer(path).optimize(f)
+        except Exception as e:
+            failed += 1
+            if output.exists() and output.resolve() != path.resolve():
+                output.unlink()
+            print(f"Error: {path}: {e}", file=sys.stderr)
+            continue
+        
+        if result.kept_original:
+            print(f"{path} -> {output}: re-encoding saved nothing, copied the original {result.input_bytes} bytes")
+            continue
+        print(f"{path} -> {output}: {result.input_bytes} -> {result.output_bytes} bytes ({-result.saved_ratio:+.1%}), "
+              f"{result.input_frames} -> {result.output_frames} frames, {result.dropped_blocks} blocks dropped, "
+              f"local color tables {result.input_local_tables} -> {result.output_local_tables}, "
+              f"encoded in {result.encode_seconds * 1000:.1f} ms of {result.seconds * 1000:.1f} ms")
+    if failed:
+        exit(1)
+
+def thumbnail_path(path: Path, output: Path | None) -> Path:
+    name = f"{path.stem}.thumb.png"
+    return output / name if output is not None else path.with_name(name)
+
+def thumbnail_file(task: tuple[Path, Path, int, int, int]) -> tuple[Path, Path, dict | None, str | None]:
+    from gif_thumbnail import make_thumbnail
+    path, output, size, frames, columns = task
+    try:
+        with output.open('wb') as f:
+            result = make_thumbnail(path, f, size, frames, columns)
+    except Exception as e:
+        output.unlink(missing_ok=True)
+        return path, output, None, str(e)
+    return path, output, result.as_dict(), None
+
+def thumbnail(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog='cli.py thumbnail', description='Write PNG previews composited directly at thumbnail size, one frame or a contact sheet of several')
+    parser.add_argument('paths', nargs='+', metavar='path', help='GIF files, directories (searched recursively) or glob patterns')
+    parser.add_argument('-o', '--output', type=Path, help='Output directory (default: NAME.thumb.png next to each input)')
+    parser.add_argument('-s', '--size', type=int, default=160, help='Longest side of each preview in pixels (default: 160)')
+    parser.add_argument('-f', '--frames', type=int, default=1, help='Evenly spaced frames to lay out as a contact sheet (default: 1)')
+    parser.add_argument('-c', '--columns', type=int, default=4, help='Contact sheet columns (default: 4)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='Worker processes (default: CPU count)')
+    args = parser.parse_args(argv)
+    if args.size < 1 or args.frames < 1 or args.columns < 1:
+        parser.error("--size, --frames and --columns must be at least 1")
+    
+    paths = list(dict.fromkeys(expand_paths(args.paths)))
+    if not paths:
+        print("Error: no GIF files found")
+        exit(1)
+    reject_archives(paths)
+    if args.output:
+        args.output.mkdir(parents=True, exist_ok=True)
+    
+    tasks = [(path, thumbnail_path(path, args.output), args.size, args.frames, args.columns) for path in paths]
+    jobs = max(1, min(args.jobs, len(tasks)))
+    failed = 0
+    start = time.perf_counter()
+    with Pool(jobs) if jobs > 1 else nullcontext() as pool:
+        results = pool.imap_unordered(thumbnail_file, tasks) if pool else map(thumbnail_file, tasks)
+        for path, output, result, error in results:
+            if error:
+                failed += 1
+                print(f"Error: {path}: {error}", file=sys.stderr)
+                continue
+            print(f"{path} -> {output}: {result['width']}x{result['height']} from {result['canvas_width']}x{result['canvas_height']}, "
+                  f"{result['tiles']} of {result['frames']} frames in {result['seconds'] * 1000:.1f} ms")
+    print(f"{len(tasks) - failed} of {len(tasks)} thumbnails in {time.perf_counter() - start:.2f} s with {jobs} workers", file=sys.stderr)
+    if failed:
+        exit(1)
+
+def aggregate_file(path: Path) -> tuple[Path, dict | None, str | None]:
+    # Workers reduce each file to a small record, so only records cross the process boundary
+    from gif_aggregate import file_record
+    path, gif_parser, error, _ = analyze_file(path)
+    return path, file_record(gif_parser) if error is None else None, error
+
+def aggregate_files(paths: Iterable[Path], jobs: int, chunksize: int,
+                    cache: AnalysisCache | None) -> Iterator[tuple[Path, dict | None, str | None]]:
+    # Paths and zip members are handed to the workers as they are found; tars are streamed through here afterwards
+    from gif_aggregate import file_record
+    init_worker(cache, False)
+    tars, errors = [], []
+    tasks = expand_archives(paths, tars, errors)
+    # Only a batch too small to fill every worker's chunks is counted; larger ones keep streaming
+    head = list(islice(tasks, jobs * 4 * chunksize))
+    if len(head) < jobs * 4 * chunksize:
+        jobs = max(1, min(jobs, len(head)))
+        chunksize = pool_chunksize(chunksize, len(head), jobs)
+    tasks = chain(head, tasks)
+    with Pool(jobs, init_worker, (cache, False)) if jobs > 1 else nullcontext() as pool:
+        yield from pool.imap_unordered(aggregate_file, tasks, chunksize) if pool else map(aggregate_file, tasks)
+    for path, error in errors:
+        yield path, None, error
+    for tar in tars:
+        for path, gif_parser, error, _ in analyze_tar(tar):
+            yield path, file_record(gif_parser) if error is None else None, error
+
+def aggregate(argv: list[str]) -> None:
+    from gif_aggregate import FleetAggregate
+    parser = argparse.ArgumentParser(prog='cli.py aggregate', description='Summarize many GIFs as distributions and counts, in a summary that merges with summaries of other shards')
+    parser.add_argument('paths', nargs='*', metavar='path', help='GIF files, directories (searched recursively), glob patterns, zip or tar archives or archive!member')
+    parser.add_argument('--merge', nargs='+', default=[], type=Path, metavar='SUMMARY', help='JSON summaries written by earlier runs to merge in')
+    parser.add_argument('-o', '--output', type=Path, help='Write the mergeable JSON summary to this file')
+    parser.add_argument('-f', '--format', choices=('text', 'json'), default='text', help='Report printed to stdout (default: text)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes (0 = one per CPU)')
+    parser.add_argument('--chunksize', type=int, default=16, help='Files handed to a worker at a time')
+    parser.add_argument('--cache-dir', type=Path, default=os.environ.get(CACHE_DIR_ENV),
+                        help=f'Reuse results stored in this directory for unchanged files (default: ${CACHE_DIR_ENV})')
+    parser.add_argument('--top', type=int, default=5, help='Most common values listed per category in the text report')
+    args = parser.parse_args(argv)
+    if not args.paths and not args.merge:
+        parser.error("give paths to analyze or summaries to --merge")
+    
+    fleet = FleetAggregate()
+    for summary in args.merge:
+        try:
+            fleet.merge(FleetAggregate.from_dict(json.loads(summary.read_text(encoding='utf-8'))))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error: {summary}: {e}", file=sys.stderr)
+            exit(1)
+    
+    # Paths are expanded lazily and results folded in as they arrive, so memory stays flat however many files there are
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    cache = AnalysisCache(args.cache_dir) if args.cache_dir else None
+    paths = (path for path in expand_paths(args.paths) if path != STDIN)
+    for path, record, error in aggregate_files(paths, jobs, args.chunksize, cache):
+        if error is not None:
+            fleet.add_error(error)
+            print(f"Error: {path}: {error}", file=sys.stderr)
+        else:
+            fleet.add(record)
+    if cache is not None:
+        cache.evict()
+        cache.close()
+    
+    summary = fleet.as_dict()
+    if args.output:
+        with args.output.open('w', encoding='utf-8') as f:
+            json.dump(summary, f)
+    if args.format == 'json':
+        print(json.dumps(summary))
+    else:
+        for line in fleet.iter_report(args.top):
+            print(line)
+
+COMMANDS: dict[str, Callable[[list[str]], None]] = {
+    'aggregate': aggregate,
+    'optimize': optimize,
+    'thumbnail': thumbnail
+}
 
 def main():
+    # Subcommands come first; anything else is a path to analyze
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(description='Analyze GIF files and extract detailed information')
-    parser.add_argument('file', type=Path, help='Path to GIF file to analyze')
+    parser.add_argument('paths', nargs='*', metavar='path', help='GIF files, directories (searched recursively), glob patterns, zip or tar archives, archive!member or - for stdin')
     parser.add_argument('-o', '--output', type=Path, help='Save result to specified file')
+    parser.add_argument('-f', '--format', choices=WRITERS, default='text', help='Output format (default: text)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes (0 = one per CPU)')
+    parser.add_argument('--chunksize', type=int, default=16, help='Files handed to a worker at a time')
+    parser.add_argument('--cache-dir', type=Path, default=os.environ.get(CACHE_DIR_ENV),
+                        help=f'Reuse results stored in this directory for unchanged files (default: ${CACHE_DIR_ENV})')
+    parser.add_argument('--cache-hash', action='store_true', help='Also compare a sampled content hash before reusing a cached result')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the analysis cache')
+    parser.add_argument('--refresh', action='store_true', help='Analyze every file again and update the cache')
+    parser.add_argument('--write-index', action='store_true', help='Write a frame offset index next to each analyzed file')
+    parser.add_argument('--colors', action='store_true', help='Decode the frames and add color histograms, unique color counts and transparency coverage (needs NumPy)')
+    parser.add_argument('--diff', action='store_true', help='Composite the frames and report duplicate frames, the changed region of each frame and the bytes spent outside it (needs NumPy)')
+    parser.add_argument('--summary', action='store_true', help='Only report canvas size, frame count, loop count and duration')
+    parser.add_argument('--max-frames', type=int, help='With --summary, stop after this many frames')
+    parser.add_argument('--max-bytes', type=int, help='With --summary, read at most this many bytes of each file')
+    parser.add_argument('--deadline', type=float, metavar='SECONDS', help='With --summary, stop scanning a file after this many seconds')
+    parser.add_argument('--stats', action='store_true', help='Print I/O, block counters and per-phase timings for each file to stderr')
+    parser.add_argument('--profile', nargs='?', const='-', metavar='FILE',
+                        help='Run under cProfile in a single process; print the top functions to stderr or save the stats to FILE')
+    
+    parser.add_argument('--serve-stdio', action='store_true',
+                        help='Stay running and analyze one path or JSON request per stdin line, answering with one JSON line each')
+    parser.add_argument('--ordered', action='store_true', help='With --serve-stdio and -j, answer in request order instead of as results finish')
     
     args = parser.parse_args()
+    if any(limit is not None and limit < 1 for limit in (args.max_frames, args.max_bytes)):
+        parser.error("--max-frames and --max-bytes must be at least 1")
+    if args.serve_stdio:
+        if args.paths:
+            parser.error("--serve-stdio reads paths from stdin")
+        serve(args)
+        return
+    if not args.paths:
+        parser.error("at least one path is required")
+    if args.profile is None:
+        run(args)
+        return
     
+    profiler = cProfile.Profile()
     try:
-        gif_parser = GifParser(args.file)
-        info = gif_parser.parse_file()
-
-        text = []
-        text.append("=== GIF Information ===")
-        for section, items in info['headers'].items():
-            text.append(f"\n{section}:")
-            for key, (value, description) in items.items():
-                text.append(f"{key}: {value} ({description})")
-        
-        text.append("\n=== Frame Information ===")
-        for i, frame in enumerate(info['frames'], 1):
-            text.append(f"\nFrame {i}:")
-            for key, value in frame.items():
-                text.append(f"{key}: {value}")
-        
-        result = "\n".join(text)
-        
-        if args.output:
-            args.output.write_text(result, encoding='utf-8')
-            print(f"Result saved to {args.output}")
+        profiler.runcall(run, args)
+    finally:
+        if args.profile == '-':
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(25)
         else:
-            print(result)
+            profiler.dump_stats(args.profile)
+
+def run(args: argparse.Namespace) -> None:
+    # Worker processes are not profiled, so profiling keeps everything in this one
+    jobs = 1 if args.profile else args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    paths = list(dict.fromkeys(expand_paths(args.paths)))
+    
+    if not paths:
+        print("Error: no GIF files found")
+        exit(1)
+    
+    # An archive is a batch of its members
+    batch = len(paths) > 1 or any(archive_kind(path) for path in paths)
+    succeeded = failed = 0
+    out = args.output.open('w', encoding='utf-8') if args.output else sys.stdout
+    
+    text = args.format == 'text'
+    writer = WRITERS[args.format](out, batch, args.summary, args.colors and not args.summary, args.diff and not args.summary)
+    # Summaries are cheaper to compute than to look up, so they bypass the cache
+    cache = AnalysisCache(args.cache_dir, hash_content=args.cache_hash) if args.cache_dir and not args.no_cache and not args.summary else None
+    scan = {'max_frames': args.max_frames, 'max_bytes': args.max_bytes, 'deadline': args.deadline} if args.summary else None
+    hits = misses = 0
+    
+    try:
+        writer.begin()
+        for path, gif_parser, error, cached in analyze_files(paths, jobs, args.chunksize, cache, args.refresh, args.stats, scan, args.colors, args.diff):
+            if cache is not None and path != STDIN and path.is_file():
+                hits += cached
+                misses += not cached
+            if error is not None:
+                failed += 1
+                writer.error(path, error)
+                print(f"Error: {path}: {error}" if batch else f"Error: {error}", file=sys.stdout if text and not batch else sys.stderr)
+                continue
             
-    except Exception as e:
-        print(f"Error: {str(e)}")
+            succeeded += 1
+            if scan is not None:
+                writer.write_summary(path, gif_parser)
+                continue
+            if args.stats and gif_parser.stats is not None:
+                start = time.perf_counter()
+                writer.write(path, gif_parser)
+                timings = gif_parser.stats.timings
+                timings['report'] = timings.get('report', 0.0) + time.perf_counter() - start
+            else:
+                writer.write(path, gif_parser)
+            if args.write_index and path != STDIN and path.is_file():
+                FrameIndex.from_parser(gif_parser, path.stat()).save(FrameIndex.sidecar_path(path))
+            if args.stats:
+                print(format_stats(path, gif_parser, cached), file=sys.stderr)
+        writer.end()
+    finally:
+        if args.output:
+            out.close()
+    
+    if args.output and succeeded:
+        print(f"Result saved to {args.output}")
+    if batch:
+        print(f"Analyzed {succeeded + failed} files: {succeeded} succeeded, {failed} failed", file=sys.stderr)
+    if cache is not None:
+        evicted = cache.evict()
+        print(f"Cache: {hits} hits, {misses} misses, {evicted} evicted", file=sys.stderr)
+        cache.close()
+    if failed:
         exit(1)
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except BrokenPipeError:
+        # The reader went away, e.g. output piped into head; stdout goes to devnull so the exit flush cannot fail again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
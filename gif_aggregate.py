@@ -0,0 +1,219 @@
+import math
+from collections import Counter
+from typing import Iterator
+from gif_parser import GifParser
+
+# Version of the summary written by FleetAggregate.as_dict; summaries merge only with their own version
+AGGREGATE_VERSION = 1
+RELATIVE_ACCURACY = 0.01
+MAX_BINS = 2048
+MAX_KEYS = 256
+OTHER = 'other'
+QUANTILES = (0.5, 0.9, 0.99)
+
+METRICS: tuple[str, ...] = ('frame_count', 'duration_ms', 'frame_rate', 'width', 'height', 'megapixels', 'file_size')
+FLAGS: tuple[str, ...] = ('animated', 'interlaced', 'transparency', 'local_color_tables', 'global_color_table', 'comment')
+CATEGORIES: tuple[str, ...] = ('loop_count', 'canvas', 'version')
+
+class QuantileSketch:
+    # Logarithmic bins: every value in bin k lies within relative_accuracy of the bin's estimate,
+    # so quantiles keep that accuracy however many values are added or sketches merged
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY, max_bins: int = MAX_BINS):
+        self.relative_accuracy: float = relative_accuracy
+        self.max_bins: int = max_bins
+        self.count: int = 0
+        self.zeros: int = 0
+        self.total: float = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+        self.bins: Counter[int] = Counter()
+        self._gamma: float = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma: float = math.log(self._gamma)
+    
+    def add(self, value: float) -> None:
+        if value < 0:
+            raise ValueError(f"Sketches hold non-negative values, got {value}")
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if value == 0:
+            self.zeros += 1
+            return
+        self.bins[math.ceil(math.log(value) / self._log_gamma)] += 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+    
+    def merge(self, other: 'QuantileSketch') -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.count += other.count
+        self.zeros += other.zeros
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        self.bins.update(other.bins)
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+    
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zeros:
+            return 0.0
+        seen = self.zeros
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                estimate = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+    
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+    
+    def as_dict(self) -> dict:
+        return {
+            'relative_accuracy': self.relative_accuracy, 'count': self.count, 'zeros': self.zeros,
+            'sum': self.total, 'min': self.min, 'max': self.max, 'bins': sorted(self.bins.items())
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'QuantileSketch':
+        sketch = cls(data['relative_accuracy'])
+        sketch.count, sketch.zeros, sketch.total = data['count'], data['zeros'], data['sum']
+        sketch.min, sketch.max = data['min'], data['max']
+        sketch.bins.update({int(key): count for key, count in data['bins']})
+        return sketch
+    
+    def _collapse(self) -> None:
+        # The smallest bins are folded together, giving up accuracy only at the low end
+        keys = sorted(self.bins)
+        excess = keys[:len(keys) - self.max_bins + 1]
+        self.bins[excess[-1]] += sum(self.bins.pop(key) for key in excess[:-1])
+
+class BoundedCounter:
+    # Counts at most max_keys distinct values; later values fall into OTHER once it is full
+    def __init__(self, max_keys: int = MAX_KEYS):
+        self.max_keys: int = max_keys
+        self.counts: Counter[str] = Counter()
+    
+    def add(self, key: str, count: int = 1) -> None:
+        if key not in self.counts and len(self.counts) >= self.max_keys:
+            key = OTHER
+        self.counts[key] += count
+    
+    def merge(self, other: 'BoundedCounter') -> None:
+        for key, count in other.counts.most_common():
+            self.add(key, count)
+    
+    def top(self, n: int) -> list[tuple[str, int]]:
+        return self.counts.most_common(n)
+
+def file_record(parser: GifParser) -> dict[str, int | float | bool | str | None]:
+    summary = parser.get_summary()
+    frames = parser.frames
+    width, height = summary['width'] or 0, summary['height'] or 0
+    return {
+        'frame_count': summary['frame_count'],
+        'duration_ms': summary['duration_ms'],
+        'frame_rate': summary['frame_rate'],
+        'width': width,
+        'height': height,
+        'megapixels': width * height / 1e6,
+        'file_size': summary['file_size'],
+        'animated': summary['frame_count'] > 1,
+        'interlaced': any(frame.interlaced for frame in frames),
+        'transparency': any(frame.transparency for frame in frames),
+        'local_color_tables': any(frame.local_color_table for frame in frames),
+        'global_color_table': bool(summary['global_color_table']),
+        'comment': summary['comment'] is not None,
+        # Loop counts are only meaningful for animations; None is a file without a NETSCAPE extension
+        'loop_count': 'none' if summary['loop_count'] is None else str(summary['loop_count']),
+        'canvas': f"{width}x{height}",
+        'version': summary['version'] or 'unknown'
+    }
+
+class FleetAggregate:
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY):
+        self.files: int = 0
+        self.failed: int = 0
+        self.errors: BoundedCounter = BoundedCounter()
+        self.metrics: dict[str, QuantileSketch] = {name: QuantileSketch(relative_accuracy) for name in METRICS}
+        self.flags: Counter[str] = Counter(dict.fromkeys(FLAGS, 0))
+        self.categories: dict[str, BoundedCounter] = {name: BoundedCounter() for name in CATEGORIES}
+    
+    def add(self, record: dict[str, int | float | bool | str | None]) -> None:
+        self.files += 1
+        for name, sketch in self.metrics.items():
+            # Frame rates are missing for files without delays
+            if record[name] is not None:
+                sketch.add(record[name])
+        for name in FLAGS:
+            self.flags[name] += bool(record[name])
+        for name, counter in self.categories.items():
+            counter.add(record[name])
+    
+    def add_error(self, message: str) -> None:
+        self.failed += 1
+        self.errors.add(message)
+    
+    def merge(self, other: 'FleetAggregate') -> None:
+        self.files += other.files
+        self.failed += other.failed
+        self.errors.merge(other.errors)
+        for name, sketch in self.metrics.items():
+            sketch.merge(other.metrics[name])
+        self.flags.update(other.flags)
+        for name, counter in self.categories.items():
+            counter.merge(other.categories[name])
+    
+    def as_dict(self) -> dict:
+        return {
+            'version': AGGREGATE_VERSION,
+            'files': self.files,
+            'failed': self.failed,
+            'errors': dict(self.errors.counts),
+            'metrics': {name: sketch.as_dict() for name, sketch in self.metrics.items()},
+            'flags': dict(self.flags),
+            'categories': {name: dict(counter.counts) for name, counter in self.categories.items()}
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'FleetAggregate':
+        if data.get('version') != AGGREGATE_VERSION:
+            raise ValueError(f"Unsupported aggregate version {data.get('version')}")
+        aggregate = cls()
+        aggregate.files, aggregate.failed = data['files'], data['failed']
+        aggregate.errors.counts.update(data['errors'])
+        aggregate.metrics = {name: QuantileSketch.from_dict(sketch) for name, sketch in data['metrics'].items()}
+        aggregate.flags.update(data['flags'])
+        for name, counts in data['categories'].items():
+            aggregate.categories[name].counts.update(counts)
+        return aggregate
+    
+    def iter_report(self, top: int = 5) -> Iterator[str]:
+        yield "=== Fleet Summary ==="
+        yield f"Files: {self.files} analyzed, {self.failed} failed"
+        yield ""
+        yield f"{'metric':14} {'count':>8} {'min':>12} {'p50':>12} {'p90':>12} {'p99':>12} {'max':>12} {'mean':>12}"
+        for name, sketch in self.metrics.items():
+            values = (sketch.min, *(sketch.quantile(q) for q in QUANTILES), sketch.max, sketch.mean)
+            yield f"{name:14} {sketch.count:8} " + ' '.join('           -' if value is None else f"{value:12.6g}" for value in values)
+        yield ""
+        for name in FLAGS:
+            share = self.flags[name] / self.files if self.files else 0.0
+            yield f"{name}: {self.flags[name]} ({share:.1%})"
+        for name, counter in self.categories.items():
+            yield ""
+            yield f"Most common {name.replace('_', ' ')}:"
+            for key, count in counter.top(top):
+                yield f"  {key}: {count}"
+        if self.failed:
+            yield ""
+            yield "Most common errors:"
+            for key, count in self.errors.top(top):
+                yield f"  {key}: {count}"
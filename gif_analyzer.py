@@ -1,8 +1,26 @@
 import customtkinter as ctk
 from tkinter import filedialog
 from PIL import Image, ImageTk
-from gif_parser import GifParser
+from gif_cache import AnalysisCache
+from gif_frame_cache import FrameCache
+from gif_loader import LoadJob
+from gif_playback import PlaybackClock
 from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import itertools
+import math
+import queue
+import threading
+import numpy as np
+
+@lru_cache(maxsize=4)
+def checkerboard(width, height, cell_size=10):
+    cells = (np.arange(height)[:, None] // cell_size + np.arange(width)[None, :] // cell_size) % 2
+    board = np.where(cells, np.uint8(192), np.uint8(255)).astype(np.uint8)
+    board.setflags(write=False)
+    return board
 
 class GifAnalyzer(ctk.CTk):
     def __init__(self):
@@ -24,6 +42,13 @@ class GifAnalyzer(ctk.CTk):
         )
         self.select_button.pack(side="left", padx=5)
         
+        self.progress_bar = ctk.CTkProgressBar(self.top_frame, width=150)
+        self.progress_bar.set(0)
+        self.progress_bar.pack(side="left", padx=5)
+        
+        self.status_label = ctk.CTkLabel(self.top_frame, text="")
+        self.status_label.pack(side="left", padx=5)
+        
         self.zoom_frame = ctk.CTkFrame(self.top_frame)
         self.zoom_frame.pack(side="right", padx=5)
         
@@ -84,6 +109,9 @@ class GifAnalyzer(ctk.CTk):
         self.frame_label = ctk.CTkLabel(self.controls_left, text="Frame: 0/0")
         self.frame_label.pack(side="left", padx=5)
         
+        self.fps_label = ctk.CTkLabel(self.controls_left, text="")
+        self.fps_label.pack(side="left", padx=5)
+        
         self.controls_right = ctk.CTkFrame(self.playback_frame)
         self.controls_right.pack(side="right", padx=5)
         
@@ -127,11 +155,32 @@ class GifAnalyzer(ctk.CTk):
         self.save_button.pack(side="right", padx=5)
         
         self.current_image = None
-        self.frames = []
-        self.original_frames = []
+        self.frame_cache = None
+        self.photo_cache = OrderedDict()
+        self.photo_cache_bytes = 0
+        self.photo_cache_budget = 64 * 1024 * 1024
+        self.render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gif-render')
+        self.pending_renders = {}
+        self.render_after_id = None
+        self.render_delay = 40
+        self.prefetch_count = 4
+        # Only ever used from the single loader thread, which also owns its SQLite connection
+        self.analysis_cache = AnalysisCache.from_environment()
+        self.preview_caches = {}
+        self.preview_lock = threading.Lock()
+        self.preview_budget = 64 * 1024 * 1024
+        self.load_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gif-load')
+        self.load_job = None
+        self.load_after_id = None
+        self.load_poll_interval = 30
+        self.info_lines = None
+        self.info_after_id = None
+        self.info_chunk_lines = 200
         self.current_frame_index = 0
         self.total_frames = 0
-        self.animation_speed = 100
+        self.playback = None
+        self.playback_speed = 1.0
+        self.animation_after_id = None
         self.zoom_level = 1.0
         self.max_zoom = 32.0
         self.min_zoom = 0.1
@@ -145,26 +194,26 @@ class GifAnalyzer(ctk.CTk):
         self.canvas.bind("<ButtonPress-1>", self.start_pan)
         self.canvas.bind("<B1-Motion>", self.pan)
         self.canvas.bind("<MouseWheel>", self.mouse_wheel)
-        
+    
     def update_frame_counter(self):
         self.frame_label.configure(text=f"Frame: {self.current_frame_index + 1}/{self.total_frames}")
-        
+    
     def prev_frame(self):
-        if not self.frames:
+        if not self.total_frames:
             return
         self.stop_animation()
         self.current_frame_index = (self.current_frame_index - 1) % self.total_frames
         self.update_current_frame()
-        
+    
     def next_frame(self):
-        if not self.frames:
+        if not self.total_frames:
             return
         self.stop_animation()
         self.current_frame_index = (self.current_frame_index + 1) % self.total_frames
         self.update_current_frame()
-        
+    
     def toggle_animation(self):
-        if not self.frames:
+        if not self.total_frames or self.playback is None:
             return
         if self.animation_running:
             self.stop_animation()
@@ -172,48 +221,134 @@ class GifAnalyzer(ctk.CTk):
         else:
             self.start_animation()
             self.play_pause_btn.configure(text="STOP")
-            
+    
     def update_current_frame(self):
-        if self.frames:
+        if self.total_frames:
+            region = self.visible_region()
             self.canvas.delete("gif")
-            self.canvas.create_image(200, 150, image=self.frames[self.current_frame_index], anchor="center", tags="gif")
+            if region is not None:
+                box, x, y = region
+                self.canvas.create_image(x, y, image=self.get_photo(self.current_frame_index, box), anchor="nw", tags="gif")
             self.update_frame_counter()
+            if self.animation_running and region is not None:
+                self.prefetch_renders(region[0])
+    
+    def visible_region(self):
+        screen = self.frame_cache.screen
+        zoom = self.zoom_level
+        left = 200 - screen.width * zoom / 2
+        top = 150 - screen.height * zoom / 2
+        view_left = self.canvas.canvasx(0)
+        view_top = self.canvas.canvasy(0)
+        view_right = view_left + int(self.canvas.cget("width"))
+        view_bottom = view_top + int(self.canvas.cget("height"))
+        
+        x0 = max(0, math.floor((view_left - left) / zoom))
+        y0 = max(0, math.floor((view_top - top) / zoom))
+        x1 = min(screen.width, math.ceil((view_right - left) / zoom))
+        y1 = min(screen.height, math.ceil((view_bottom - top) / zoom))
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return (x0, y0, x1, y1), left + x0 * zoom, top + y0 * zoom
+    
+    def get_photo(self, index, box):
+        key = (index, self.zoom_level, box)
+        photo = self.photo_cache.get(key)
+        if photo is not None:
+            self.photo_cache.move_to_end(key)
+            return photo
+        
+        pending = self.pending_renders.pop(key, None)
+        if pending is not None and pending.done() and pending.exception() is None:
+            image = pending.result()
+        else:
+            image = self.render_frame(index, self.zoom_level, box)
+        
+        photo = ImageTk.PhotoImage(image)
+        self.photo_cache[key] = photo
+        self.photo_cache_bytes += image.width * image.height * 4
+        while self.photo_cache_bytes > self.photo_cache_budget and len(self.photo_cache) > 1:
+            _, evicted = self.photo_cache.popitem(last=False)
+            self.photo_cache_bytes -= evicted.width() * evicted.height() * 4
+        return photo
+    
+    def render_frame(self, index, zoom, box):
+        x0, y0, x1, y1 = box
+        screen = self.frame_cache.screen
+        # Zoomed out by half or more, frames come from a cache composited at a power-of-two fraction of the size
+        factor = 1 << int(math.log2(1 / zoom)) if zoom <= 0.5 else 1
+        frame_cache = self.preview_cache(factor) if factor > 1 else self.frame_cache
+        width, height = frame_cache.size
+        if factor > 1:
+            x0, x1 = x0 * width // screen.width, max(x0 * width // screen.width + 1, -(-x1 * width // screen.width))
+            y0, y1 = y0 * height // screen.height, max(y0 * height // screen.height + 1, -(-y1 * height // screen.height))
+        pixels = frame_cache.get(index)[y0:y1, x0:x1]
+        checker = self.create_checkerboard(width, height, max(1, 10 // factor))[y0:y1, x0:x1, None]
+        
+        alpha = pixels[..., 3:].astype(np.uint16)
+        blended = (pixels[..., :3] * alpha + checker * (255 - alpha) + 127) // 255
+        region = Image.fromarray(blended.astype(np.uint8))
+        zoom *= factor
+        return self.resize_image(region, zoom) if zoom != 1.0 else region
+    
+    def preview_cache(self, factor):
+        # Called from the render thread as well, so creation is serialized
+        with self.preview_lock:
+            frame_cache = self.preview_caches.get(factor)
+            if frame_cache is None:
+                screen = self.frame_cache.screen
+                size = (max(1, screen.width // factor), max(1, screen.height // factor))
+                frame_cache = FrameCache(self.current_file, self.preview_budget, index=self.load_job.index, size=size)
+                self.preview_caches[factor] = frame_cache
+            return frame_cache
+    
+    def prefetch_renders(self, box):
+        zoom = self.zoom_level
+        for key in [key for key in self.pending_renders if key[1:] != (zoom, box)]:
+            self.pending_renders.pop(key).cancel()
+        for offset in range(1, self.prefetch_count + 1):
+            index = (self.current_frame_index + offset) % self.total_frames
+            key = (index, zoom, box)
+            if key not in self.photo_cache and key not in self.pending_renders:
+                self.pending_renders[key] = self.render_executor.submit(self.render_frame, index, zoom, box)
+    
+    def request_render(self):
+        if self.render_after_id is not None:
+            self.after_cancel(self.render_after_id)
+        self.render_after_id = self.after(self.render_delay, self.render_requested)
+    
+    def render_requested(self):
+        self.render_after_id = None
+        self.update_current_frame()
     
     def mouse_wheel(self, event):
-        if not self.frames:
+        if not self.total_frames:
             return
-            
+        
         if event.delta > 0:
             self.zoom_level = min(32.0, self.zoom_level * 1.1)
         else:
             self.zoom_level = max(0.1, self.zoom_level / 1.1)
-            
-        self.update_frames_zoom()
         
+        self.request_render()
+    
     def start_pan(self, event):
         self.canvas.scan_mark(event.x, event.y)
         self.pan_start_x = event.x
         self.pan_start_y = event.y
-        
+    
     def pan(self, event):
         self.canvas.scan_dragto(event.x, event.y, gain=1)
-        
+        if self.total_frames:
+            self.request_render()
+    
     def create_checkerboard(self, width, height, cell_size=10):
-        image = Image.new('RGB', (width, height), 'white')
-        pixels = image.load()
-        
-        for i in range(0, width, cell_size):
-            for j in range(0, height, cell_size):
-                if (i // cell_size + j // cell_size) % 2:
-                    for x in range(i, min(i + cell_size, width)):
-                        for y in range(j, min(j + cell_size, height)):
-                            pixels[x, y] = (192, 192, 192)
-        return image
+        return checkerboard(width, height, cell_size)
     
     def resize_image(self, image, zoom=1.0):
         width, height = image.size
-        new_width = int(width * zoom)
-        new_height = int(height * zoom)
+        new_width = max(1, int(width * zoom))
+        new_height = max(1, int(height * zoom))
         return image.resize((new_width, new_height), Image.Resampling.NEAREST if zoom > 1 else Image.Resampling.LANCZOS)
     
     def zoom_in(self):
@@ -227,7 +362,7 @@ class GifAnalyzer(ctk.CTk):
             self.update_frames_zoom()
     
     def reset_zoom(self):
-        if not self.frames:
+        if not self.total_frames:
             return
         self.zoom_level = 1.0
         self.canvas.xview_moveto(0)
@@ -235,16 +370,13 @@ class GifAnalyzer(ctk.CTk):
         self.update_frames_zoom()
     
     def update_frames_zoom(self):
-        self.frames.clear()
-        for original in self.original_frames:
-            resized = self.resize_image(original, self.zoom_level)
-            self.frames.append(ImageTk.PhotoImage(resized))
-        self.update_current_frame()
+        if self.total_frames:
+            self.request_render()
     
     def get_formatted_result(self):
         if not hasattr(self, 'gif_info'):
             return ""
-            
+        
         text = []
         
         # Add headers info
@@ -260,7 +392,7 @@ class GifAnalyzer(ctk.CTk):
             text.append(f"\nFrame {i}:")
             for key, value in frame.items():
                 text.append(f"{key}: {value}")
-                
+        
         return "\n".join(text)
     
     def format_table(self, data):
@@ -275,110 +407,186 @@ class GifAnalyzer(ctk.CTk):
         file_path = filedialog.askopenfilename(filetypes=[("GIF files", "*.gif")])
         if file_path:
             self.load_gif(file_path)
-            
+    
     def load_gif(self, file_path):
-        try:
-            self.frames = []
-            self.original_frames = []
-            self.current_frame_index = 0
-            self.animation_running = False
-            self.play_pause_btn.configure(text="PLAY")
-            
-            self.image = Image.open(file_path)
-            self.current_file = str(file_path)
-            
+        self.cancel_load()
+        self.photo_cache.clear()
+        self.photo_cache_bytes = 0
+        self.pending_renders.clear()
+        self.total_frames = 0
+        self.current_frame_index = 0
+        self.stop_animation()
+        self.playback = None
+        self.fps_label.configure(text="")
+        self.play_pause_btn.configure(text="PLAY")
+        self.canvas.delete("gif")
+        self.update_frame_counter()
+        
+        self.current_file = str(file_path)
+        if hasattr(self, 'gif_info'):
+            del self.gif_info
+        self.info_text.configure(state="normal")
+        self.info_text.delete("1.0", "end")
+        self.info_text.configure(state="disabled")
+        self.progress_bar.set(0)
+        self.status_label.configure(text="Loading...")
+        
+        self.load_job = LoadJob(file_path, self.analysis_cache)
+        self.load_executor.submit(self.load_job.run)
+        self.load_after_id = self.after(self.load_poll_interval, self.poll_load)
+    
+    def cancel_load(self):
+        # Stops the previous file's loader and drops everything it already handed over
+        if self.load_after_id is not None:
+            self.after_cancel(self.load_after_id)
+            self.load_after_id = None
+        if self.info_after_id is not None:
+            self.after_cancel(self.info_after_id)
+            self.info_after_id = None
+        self.info_lines = None
+        
+        job = self.load_job
+        self.load_job = None
+        if job is not None:
+            job.cancel()
+            if job.frame_cache is not None:
+                job.frame_cache.close()
+        elif self.frame_cache is not None:
+            self.frame_cache.close()
+        self.frame_cache = None
+        with self.preview_lock:
+            for frame_cache in self.preview_caches.values():
+                frame_cache.close()
+            self.preview_caches.clear()
+    
+    def poll_load(self):
+        self.load_after_id = None
+        job = self.load_job
+        if job is None:
+            return
+        
+        # Read before draining so messages posted just before the job finished are still handled
+        finished = job.finished
+        while True:
             try:
-                while True:
-                    frame_copy = self.image.copy()
-                    if frame_copy.mode == 'P':
-                        frame_copy = frame_copy.convert('RGBA')
-                    
-                    checker = self.create_checkerboard(frame_copy.width, frame_copy.height)
-                    
-                    if frame_copy.mode == 'RGBA':
-                        checker.paste(frame_copy, mask=frame_copy.split()[3])
-                    else:
-                        checker.paste(frame_copy)
-                    
-                    self.original_frames.append(checker)
-                    self.frames.append(ImageTk.PhotoImage(checker))
-                    self.image.seek(self.image.tell() + 1)
-            except EOFError:
-                pass
-                
-            self.total_frames = len(self.frames)
+                kind, payload = job.messages.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_load_message(kind, payload)
+        
+        if not finished and self.load_job is job:
+            self.load_after_id = self.after(self.load_poll_interval, self.poll_load)
+    
+    def handle_load_message(self, kind, payload):
+        if kind == 'ready':
+            self.frame_cache = payload
+            self.total_frames = len(payload)
             self.update_frame_counter()
-            
-            if self.frames:
+            if self.total_frames:
                 self.update_current_frame()
-                
-            self.analyze_current_file()
-                
-        except Exception as e:
-            print(f"Error loading GIF: {str(e)}")
-            
-    def analyze_current_file(self):
-        if not hasattr(self, 'current_file') or not self.current_file:
-            print("No file loaded to analyze")
-            return
-            
-        try:
-            parser = GifParser(Path(self.current_file))
-            self.gif_info = parser.parse_file()
-            
+        elif kind == 'delays':
+            self.playback = PlaybackClock(payload, self.frame_cache.loop_count, self.playback_speed)
+            self.update_fps_label()
+        elif kind == 'info':
+            self.gif_info = payload
+            self.info_lines = self.iter_info_lines(payload)
             self.info_text.configure(state="normal")
-            self.info_text.delete("1.0", "end")
-            
-            self.info_text.insert("end", "=== GIF Information ===\n")
-            self.info_text.insert("end", self.format_table(self.gif_info['headers']))
-            
-            self.info_text.insert("end", "\n\n=== Frame Information ===")
-            for i, frame in enumerate(self.gif_info['frames']):
-                self.info_text.insert("end", f"\nFrame {i + 1}:")
-                for key, value in frame.items():
-                    self.info_text.insert("end", f"\n{key}: {value}")
-                    
+            self.fill_info()
+        elif kind == 'progress':
+            decoded, total = payload
+            self.progress_bar.set(decoded / total if total else 1)
+            self.status_label.configure(text=f"Decoded {decoded}/{total}")
+        elif kind == 'done':
+            self.progress_bar.set(1)
+            self.status_label.configure(text=f"{self.total_frames} frames")
+        elif kind == 'error':
+            self.status_label.configure(text="Error")
+            print(f"Error loading GIF: {payload}")
+    
+    def iter_info_lines(self, gif_info):
+        yield "=== GIF Information ==="
+        yield self.format_table(gif_info['headers'])
+        yield "\n=== Frame Information ==="
+        for i, frame in enumerate(gif_info['frames']):
+            yield f"Frame {i + 1}:"
+            for key, value in frame.items():
+                yield f"{key}: {value}"
+    
+    def fill_info(self):
+        # One insert per chunk of lines per event loop turn keeps the window responsive on long reports
+        self.info_after_id = None
+        if self.info_lines is None:
+            return
+        chunk = list(itertools.islice(self.info_lines, self.info_chunk_lines))
+        if chunk:
+            self.info_text.insert("end", "\n".join(chunk) + "\n")
+            self.info_after_id = self.after(1, self.fill_info)
+        else:
+            self.info_lines = None
             self.info_text.configure(state="disabled")
-            
-        except Exception as e:
-            print(f"Error analyzing GIF: {str(e)}")
     
     def stop_animation(self):
         self.animation_running = False
+        if self.animation_after_id is not None:
+            self.after_cancel(self.animation_after_id)
+            self.animation_after_id = None
     
     def start_animation(self):
+        if self.playback is None:
+            return
         self.animation_running = True
         self.play_pause_btn.configure(text="STOP")
-        self.animate_gif()
+        if self.playback.finished:
+            self.current_frame_index = 0
+            self.update_current_frame()
+        self.playback.start(self.current_frame_index)
+        self.schedule_animation()
+    
+    def schedule_animation(self):
+        # Waits for the current frame's deadline, which already accounts for the time spent rendering it
+        delay = max(1, round(self.playback.remaining() * 1000))
+        self.animation_after_id = self.after(delay, self.animate_gif)
     
     def animate_gif(self):
-        if not self.animation_running or not self.frames:
+        self.animation_after_id = None
+        if not self.animation_running or not self.total_frames:
             return
         
-        self.current_frame_index = (self.current_frame_index + 1) % self.total_frames
-        self.update_current_frame()
-        self.after(self.animation_speed, self.animate_gif)
+        index = self.playback.advance()
+        if index is None:
+            self.stop_animation()
+            self.play_pause_btn.configure(text="PLAY")
+            return
+        if index != self.current_frame_index:
+            self.current_frame_index = index
+            self.update_current_frame()
+        self.update_fps_label()
+        self.schedule_animation()
+    
+    def update_fps_label(self):
+        playback = self.playback
+        text = f"{playback.measured_fps():.1f}/{playback.intended_fps():.1f} fps"
+        if playback.dropped:
+            text += f", {playback.dropped} dropped"
+        self.fps_label.configure(text=text)
     
     def change_speed(self, value):
-        speed_multiplier = {
-            "0.25x": 4.0,
-            "0.5x": 2.0,
-            "1x": 1.0,
-            "2x": 0.5,
-            "4x": 0.25
-        }
-        self.animation_speed = int(100 * speed_multiplier[value])
+        self.playback_speed = float(value.rstrip("x"))
+        if self.playback is not None:
+            self.playback.speed = self.playback_speed
+            if self.animation_running:
+                self.playback.start(self.current_frame_index)
     
     def copy_result(self):
         result = self.get_formatted_result()
         if result:
             self.clipboard_clear()
             self.clipboard_append(result)
-            
+    
     def save_result(self):
         if not hasattr(self, 'gif_info'):
             return
-            
+        
         # Get original file name without extension
         original_name = Path(self.current_file).stem if hasattr(self, 'current_file') else "gif"
         default_name = f"{original_name}_analysis.txt"
@@ -0,0 +1,71 @@
+import tarfile
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+# Members are named archive!member, as in jar: URLs
+MEMBER_SEPARATOR = '!'
+ZIP_SUFFIXES: tuple[str, ...] = ('.zip',)
+TAR_SUFFIXES: tuple[str, ...] = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+def archive_kind(path: Path | str) -> str | None:
+    name = str(path).lower()
+    if name.endswith(ZIP_SUFFIXES):
+        return 'zip'
+    if name.endswith(TAR_SUFFIXES):
+        return 'tar'
+    return None
+
+def is_gif_member(name: str) -> bool:
+    return name.lower().endswith('.gif')
+
+def member_path(archive: Path | str, member: str) -> Path:
+    return Path(f"{archive}{MEMBER_SEPARATOR}{member}")
+
+def split_member(path: Path | str) -> tuple[Path, str] | None:
+    # The archive is the first prefix ending at a separator that names an existing archive file,
+    # so separators inside directory or member names are left alone
+    name = str(path)
+    start = 0
+    while (position := name.find(MEMBER_SEPARATOR, start)) >= 0:
+        archive = Path(name[:position])
+        if archive_kind(archive) and archive.is_file():
+            return archive, name[position + 1:]
+        start = position + 1
+    return None
+
+def zip_members(archive: Path | str) -> list[str]:
+    with zipfile.ZipFile(archive) as bundle:
+        return [info.filename for info in bundle.infolist() if not info.is_dir() and is_gif_member(info.filename)]
+
+def iter_tar_members(archive: Path | str) -> Iterator[tuple[str, BinaryIO]]:
+    # Stream mode reads the archive front to back without seeking, so compressed tars are decompressed once;
+    # each member's stream is only valid until the next one is requested
+    with tarfile.open(archive, 'r|*') as bundle:
+        for info in bundle:
+            if info.isfile() and is_gif_member(info.name):
+                yield info.name, bundle.extractfile(info)
+
+@contextmanager
+def open_member(archive: Path | str, member: str) -> Iterator[BinaryIO]:
+    if archive_kind(archive) == 'zip':
+        with zipfile.ZipFile(archive) as bundle:
+            try:
+                stream = bundle.open(member)
+            except KeyError:
+                raise FileNotFoundError(f"File {member} not found in {archive}") from None
+            with stream:
+                yield stream
+        return
+    
+    # A tar has no directory, so finding one member means reading up to it
+    members = iter_tar_members(archive)
+    try:
+        for name, stream in members:
+            if name == member:
+                yield stream
+                return
+    finally:
+        members.close()
+    raise FileNotFoundError(f"File {member} not found in {archive}")
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from gif_parser import GifParser
+
+CACHE_DIR_ENV = 'GIF_ANALYZER_CACHE_DIR'
+SCHEMA_VERSION = 3
+
+# Sampled hash: size plus the head, middle and tail of the file
+HASH_SAMPLE_SIZE = 64 * 1024
+
+def content_digest(path: Path, size: int) -> str:
+    digest = hashlib.blake2b(size.to_bytes(8, 'little'), digest_size=16)
+    with open(path, 'rb') as f:
+        if size <= 3 * HASH_SAMPLE_SIZE:
+            digest.update(f.read())
+        else:
+            for offset in (0, (size - HASH_SAMPLE_SIZE) // 2, size - HASH_SAMPLE_SIZE):
+                f.seek(offset)
+                digest.update(f.read(HASH_SAMPLE_SIZE))
+    return digest.hexdigest()
+
+class AnalysisCache:
+    FILE_NAME: str = 'analysis.sqlite3'
+    
+    def __init__(self, directory: Path | str, max_bytes: int = 256 * 1024 * 1024,
+                 max_age: float = 30 * 24 * 3600, hash_content: bool = False):
+        self.directory: Path = Path(directory)
+        self.max_bytes: int = max_bytes
+        self.max_age: float = max_age
+        self.hash_content: bool = hash_content
+        self.hits: int = 0
+        self.misses: int = 0
+        self._connection: sqlite3.Connection | None = None
+    
+    @classmethod
+    def from_environment(cls, **kwargs) -> 'AnalysisCache | None':
+        directory = os.environ.get(CACHE_DIR_ENV)
+        return cls(directory, **kwargs) if directory else None
+    
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Opened lazily so a cache can be handed to worker processes before first use
+        if self._connection is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.directory / self.FILE_NAME, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                connection.execute("DROP TABLE IF EXISTS entries")
+                connection.execute("PRAGMA user_version=%d" % SCHEMA_VERSION)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT, "
+                "data BLOB, created REAL, accessed REAL)"
+            )
+            self._connection = connection
+        return self._connection
+    
+    def get(self, path: Path) -> GifParser | None:
+        key, stat = self._key(path)
+        row = self.connection.execute(
+            "SELECT size, mtime_ns, digest, data FROM entries WHERE path = ?", (key,)
+        ).fetchone()
+        
+        if row is None or row[0] != stat.st_size or row[1] != stat.st_mtime_ns:
+            self.misses += 1
+            return None
+        if self.hash_content and row[2] != content_digest(path, stat.st_size):
+            self.misses += 1
+            return None
+        
+        try:
+            parser = GifParser.from_dict(json.loads(zlib.decompress(row[3])), path)
+        except (zlib.error, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        self.connection.execute("UPDATE entries SET accessed = ? WHERE path = ?", (time.time(), key))
+        return parser
+    
+    def put(self, path: Path, parser: GifParser) -> None:
+        key, stat = self._key(path)
+        digest = content_digest(path, stat.st_size) if self.hash_content else None
+        data = zlib.compress(json.dumps(parser.to_dict(), separators=(',', ':')).encode())
+        now = time.time()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, stat.st_size, stat.st_mtime_ns, digest, data, now, now)
+        )
+    
+    def analyze(self, path: Path, refresh: bool = False, stats: bool = False) -> tuple[GifParser, bool]:
+        if not refresh:
+            parser = self.get(path)
+            if parser is not None:
+                return parser, True
+        else:
+            self.misses += 1
+        
+        parser = GifParser(path, stats=stats)
+        parser.parse_file()
+        self.put(path, parser)
+        return parser, False
+    
+    def evict(self) -> int:
+        connection = self.connection
+        removed = connection.execute("DELETE FROM entries WHERE accessed < ?", (time.time() - self.max_age,)).rowcount
+        
+        total = connection.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM entries").fetchone()[0]
+        if total > self.max_bytes:
+            # Drop least recently used entries until the stored payloads fit the budget
+            for key, length in connection.execute("SELECT path, LENGTH(data) FROM entries ORDER BY accessed").fetchall():
+                if total <= self.max_bytes:
+                    break
+                connection.execute("DELETE FROM entries WHERE path = ?", (key,))
+                total -= length
+                removed += 1
+        return removed
+    
+    def stats(self) -> dict[str, int]:
+        entries, size = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM entries"
+        ).fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': size}
+    
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+    
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        return state
+    
+    def _key(self, path: Path) -> tuple[str, os.stat_result]:
+        resolved = path.resolve()
+        return str(resolved), resolved.stat()
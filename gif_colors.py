@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+import numpy as np
+from gif_decoder import GifDecoder, DecodedFrame
+
+TOP_COLORS = 10
+# Each frame keeps only its most used colors, so reports stay small for long animations
+FRAME_TOP_COLORS = 5
+
+def palette_keys(table: bytes | None) -> np.ndarray:
+    # 24-bit RGB keys for all 256 indices; indices past the end of the table are black
+    colors = np.zeros((256, 3), np.uint32)
+    if table:
+        entries = np.frombuffer(table, np.uint8)[:768]
+        entries = entries[:len(entries) // 3 * 3].reshape(-1, 3)
+        colors[:len(entries)] = entries
+    return colors[:, 0] << 16 | colors[:, 1] << 8 | colors[:, 2]
+
+@dataclass(slots=True)
+class FrameColors:
+    index: int
+    pixels: int
+    unique_indices: int
+    unique_colors: int
+    transparent_pixels: int
+    # (24-bit RGB key, opaque pixel count), most used first
+    top_colors: list[tuple[int, int]]
+    
+    @property
+    def transparency_coverage(self) -> float:
+        return self.transparent_pixels / self.pixels if self.pixels else 0.0
+
+class ColorStats:
+    def __init__(self, source: Path | str | bytes | bytearray | memoryview | BinaryIO):
+        self._decoder: GifDecoder = GifDecoder(source)
+        self.frames: list[FrameColors] = []
+        # Palettes are keyed by their bytes, so repeated local tables share one entry
+        self._keys: dict[bytes | None, np.ndarray] = {}
+        self._histograms: dict[bytes | None, np.ndarray] = {}
+        self._pixels: int = 0
+        self._transparent_pixels: int = 0
+    
+    def analyze(self) -> 'ColorStats':
+        for frame in self._decoder.frames():
+            self.add(frame)
+        return self
+    
+    def add(self, frame: DecodedFrame) -> FrameColors:
+        descriptor = frame.descriptor
+        table = descriptor.local_color_table if descriptor.local_color_table_flag else self._decoder.screen.global_color_table
+        keys = self._keys.get(table)
+        if keys is None:
+            keys = self._keys[table] = palette_keys(table)
+            self._histograms[table] = np.zeros(256, np.int64)
+        
+        histogram = np.bincount(np.frombuffer(frame.indices, np.uint8), minlength=256)
+        control = frame.control
+        transparent_pixels = 0
+        if control is not None and control.transparency:
+            transparent_pixels = int(histogram[control.transparent_color_index])
+            histogram[control.transparent_color_index] = 0
+        self._histograms[table] += histogram
+        
+        used = histogram.nonzero()[0]
+        # Indices that share a color are counted together
+        frame_colors, inverse = np.unique(keys[used], return_inverse=True)
+        counts = np.bincount(inverse, weights=histogram[used]).astype(np.int64)
+        order = np.argsort(-counts, kind='stable')[:FRAME_TOP_COLORS]
+        colors = FrameColors(
+            frame.index, len(frame.indices), len(used), len(frame_colors), transparent_pixels,
+            [(int(frame_colors[i]), int(counts[i])) for i in order]
+        )
+        self.frames.append(colors)
+        self._pixels += colors.pixels
+        self._transparent_pixels += transparent_pixels
+        return colors
+    
+    def histogram(self) -> tuple[np.ndarray, np.ndarray]:
+        # Whole-file counts of opaque pixels per RGB color, most used first
+        if not self._histograms:
+            return np.zeros(0, np.uint32), np.zeros(0, np.int64)
+        keys = np.concatenate(list(self._keys.values()))
+        counts = np.concatenate(list(self._histograms.values()))
+        colors, inverse = np.unique(keys, return_inverse=True)
+        totals = np.bincount(inverse, weights=counts).astype(np.int64)
+        order = np.argsort(-totals, kind='stable')
+        order = order[totals[order] > 0]
+        return colors[order], totals[order]
+    
+    def summary(self, top: int = TOP_COLORS) -> dict[str, int | float | list]:
+        colors, counts = self.histogram()
+        return {
+            'palettes': len(self._keys),
+            'unique_colors': len(colors),
+            'pixels': self._pixels,
+            'transparent_pixels': self._transparent_pixels,
+            'transparency_coverage': round(self._transparent_pixels / self._pixels, 6) if self._pixels else 0.0,
+            'top_colors': [[f"#{color:06x}", int(count)] for color, count in zip(colors[:top], counts[:top])],
+            'frames': [
+                {
+                    'index': frame.index,
+                    'unique_indices': frame.unique_indices,
+                    'unique_colors': frame.unique_colors,
+                    'transparent_pixels': frame.transparent_pixels,
+                    'transparency_coverage': round(frame.transparency_coverage, 6),
+                    'top_colors': [[f"#{color:06x}", count] for color, count in frame.top_colors]
+                }
+                for frame in self.frames
+            ]
+        }
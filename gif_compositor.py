@@ -0,0 +1,147 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator
+import numpy as np
+from gif_decoder import GifDecoder, DecodedFrame
+from gif_stream import LogicalScreenDescriptor, ImageDescriptor
+
+# GCE disposal methods that change the canvas after a frame is shown
+DISPOSE_TO_BACKGROUND = 2
+DISPOSE_TO_PREVIOUS = 3
+
+@dataclass(slots=True)
+class CompositedFrame:
+    index: int
+    frame: DecodedFrame
+    canvas: np.ndarray
+
+@dataclass(slots=True)
+class Checkpoint:
+    canvas: np.ndarray
+    disposal: tuple[int, tuple[int, int, int, int], np.ndarray | None] | None
+
+def preview_size(width: int, height: int, max_size: int) -> tuple[int, int]:
+    # Fits the canvas into a max_size square, never enlarging it
+    scale = min(1.0, max_size / max(width, height, 1))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def sample_positions(length: int, size: int) -> np.ndarray:
+    # Source coordinate at the center of each of the size output cells
+    return (np.arange(size, dtype=np.int64) * 2 + 1) * length // (2 * size)
+
+class Canvas:
+    def __init__(self, screen: LogicalScreenDescriptor, palettes: dict[bytes | None, np.ndarray] | None = None,
+                 size: tuple[int, int] | None = None):
+        width, height = size or (screen.width, screen.height)
+        self.pixels: np.ndarray = np.zeros((height, width, 4), np.uint8)
+        # A reduced canvas keeps only these screen rows and columns, every other pixel is never resolved
+        self._rows: np.ndarray | None = None
+        self._cols: np.ndarray | None = None
+        if (width, height) != (screen.width, screen.height):
+            self._rows = sample_positions(screen.height, height)
+            self._cols = sample_positions(screen.width, width)
+        self._scratch: np.ndarray = np.empty(self.pixels.size, np.uint8)
+        self._global_color_table: bytes | None = screen.global_color_table
+        self._palettes: dict[bytes | None, np.ndarray] = palettes if palettes is not None else {}
+        self._disposal: tuple[int, tuple[int, int, int, int], np.ndarray | None] | None = None
+    
+    def palette(self, table: bytes | None) -> np.ndarray:
+        palette = self._palettes.get(table)
+        if palette is None:
+            palette = np.zeros((256, 4), np.uint8)
+            palette[:, 3] = 255
+            if table:
+                colors = np.frombuffer(table, np.uint8)[:768]
+                colors = colors[:len(colors) // 3 * 3].reshape(-1, 3)
+                palette[:len(colors), :3] = colors
+            self._palettes[table] = palette
+        return palette
+    
+    def checkpoint(self) -> Checkpoint:
+        return Checkpoint(self.pixels.copy(), self._disposal)
+    
+    def restore(self, checkpoint: Checkpoint) -> None:
+        self.pixels[...] = checkpoint.canvas
+        self._disposal = checkpoint.disposal
+    
+    def draw(self, frame: DecodedFrame) -> np.ndarray:
+        canvas = self.pixels
+        
+        if self._disposal is not None:
+            method, (top, bottom, left, right), snapshot = self._disposal
+            if method == DISPOSE_TO_BACKGROUND:
+                canvas[top:bottom, left:right] = 0
+            else:
+                canvas[top:bottom, left:right] = snapshot
+            self._disposal = None
+        
+        control = frame.control
+        top, bottom, left, right = self._rect(frame.descriptor)
+        target = canvas[top:bottom, left:right]
+        
+        if control is not None and control.disposal_method == DISPOSE_TO_PREVIOUS:
+            self._disposal = (DISPOSE_TO_PREVIOUS, (top, bottom, left, right), target.copy())
+        elif control is not None and control.disposal_method == DISPOSE_TO_BACKGROUND:
+            self._disposal = (DISPOSE_TO_BACKGROUND, (top, bottom, left, right), None)
+        
+        if target.size:
+            self._blit(frame, target, top, left)
+        return canvas
+    
+    def _rect(self, descriptor: ImageDescriptor) -> tuple[int, int, int, int]:
+        if self._rows is None:
+            height, width = self.pixels.shape[:2]
+            return (
+                min(descriptor.top, height), min(descriptor.top + descriptor.height, height),
+                min(descriptor.left, width), min(descriptor.left + descriptor.width, width)
+            )
+        rows, cols = self._rows, self._cols
+        return (
+            int(np.searchsorted(rows, descriptor.top)), int(np.searchsorted(rows, descriptor.top + descriptor.height)),
+            int(np.searchsorted(cols, descriptor.left)), int(np.searchsorted(cols, descriptor.left + descriptor.width))
+        )
+    
+    def _blit(self, frame: DecodedFrame, target: np.ndarray, top: int, left: int) -> None:
+        descriptor = frame.descriptor
+        rows, cols = target.shape[:2]
+        indices = np.frombuffer(frame.indices, np.uint8).reshape(descriptor.height, descriptor.width)
+        if self._rows is None:
+            indices = indices[:rows, :cols]
+        else:
+            indices = indices[np.ix_(self._rows[top:top + rows] - descriptor.top, self._cols[left:left + cols] - descriptor.left)]
+        palette = self.palette(descriptor.local_color_table if descriptor.local_color_table_flag else self._global_color_table)
+        colors = self._scratch[:rows * cols * 4].reshape(rows, cols, 4)
+        np.take(palette, indices, axis=0, out=colors, mode='clip')
+        
+        control = frame.control
+        if control is not None and control.transparency:
+            np.copyto(target, colors, where=(indices != control.transparent_color_index)[..., None])
+        else:
+            target[...] = colors
+
+class GifCompositor:
+    def __init__(self, source: Path | str | bytes | bytearray | memoryview | BinaryIO, max_size: int | None = None):
+        self._decoder: GifDecoder = GifDecoder(source)
+        self._palettes: dict[bytes | None, np.ndarray] = {}
+        # Frames come out fitted into a max_size square, composited at that size
+        self.max_size: int | None = max_size
+    
+    @property
+    def screen(self) -> LogicalScreenDescriptor | None:
+        return self._decoder.screen
+    
+    @property
+    def loop_count(self) -> int | None:
+        return self._decoder.loop_count
+    
+    def frames(self, copy: bool = False) -> Iterator[CompositedFrame]:
+        canvas = None
+        
+        for frame in self._decoder.frames():
+            if canvas is None:
+                screen = self._decoder.screen
+                size = preview_size(screen.width, screen.height, self.max_size) if self.max_size else None
+                canvas = Canvas(screen, self._palettes, size)
+            
+            pixels = canvas.draw(frame)
+            yield CompositedFrame(frame.index, frame, pixels.copy() if copy else pixels)
@@ -0,0 +1,126 @@
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator
+import numpy as np
+from gif_compositor import Canvas, DISPOSE_TO_BACKGROUND, DISPOSE_TO_PREVIOUS
+from gif_decoder import GifDecoder
+
+# Image descriptor and graphic control extension bytes around the LZW data
+DESCRIPTOR_BYTES = 10
+CONTROL_BYTES = 8
+SUB_BLOCK_SIZE = 255
+
+@dataclass(slots=True)
+class FrameChange:
+    index: int
+    digest: str
+    # Earlier frame with an identical composited canvas
+    duplicate_of: int | None
+    # (left, top, width, height) declared by the image descriptor and actually changed
+    declared: tuple[int, int, int, int]
+    changed: tuple[int, int, int, int] | None
+    encoded_bytes: int
+    wasted_bytes: int
+
+def encoded_size(data_length: int, color_table_bytes: int, control: bool) -> int:
+    # Assumes full 255-byte sub-blocks, which is what practically every encoder writes
+    sub_blocks = -(-data_length // SUB_BLOCK_SIZE)
+    return DESCRIPTOR_BYTES + color_table_bytes + 1 + data_length + sub_blocks + 1 + (CONTROL_BYTES if control else 0)
+
+def changed_box(current: np.ndarray, previous: np.ndarray, box: tuple[int, int, int, int]) -> tuple[int, int, int, int] | None:
+    top, bottom, left, right = box
+    if top >= bottom or left >= right:
+        return None
+    diff = (current[top:bottom, left:right] != previous[top:bottom, left:right]).any(axis=2)
+    rows = np.flatnonzero(diff.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(diff.any(axis=0))
+    return left + int(cols[0]), top + int(rows[0]), int(cols[-1] - cols[0]) + 1, int(rows[-1] - rows[0]) + 1
+
+class FrameDiagnostics:
+    def __init__(self, source: Path | str | bytes | bytearray | memoryview | BinaryIO):
+        self._decoder: GifDecoder = GifDecoder(source)
+        self.changes: list[FrameChange] = []
+    
+    def analyze(self) -> 'FrameDiagnostics':
+        for _ in self.iter_changes():
+            pass
+        return self
+    
+    def iter_changes(self) -> Iterator[FrameChange]:
+        # Only the shared canvas and a copy of the previous one are alive at any time
+        canvas = previous = None
+        previous_box = None
+        seen: dict[str, int] = {}
+        
+        for record in self._decoder.records():
+            if canvas is None:
+                canvas = Canvas(self._decoder.screen)
+                previous = canvas.pixels.copy()
+            descriptor = record.descriptor
+            pixels = canvas.draw(record.decode())
+            
+            height, width = pixels.shape[:2]
+            frame_box = (
+                min(descriptor.top, height), min(descriptor.top + descriptor.height, height),
+                min(descriptor.left, width), min(descriptor.left + descriptor.width, width)
+            )
+            # Only this frame's rectangle and the one the previous frame disposed can differ
+            box = frame_box
+            if previous_box is not None:
+                box = (min(box[0], previous_box[0]), max(box[1], previous_box[1]),
+                       min(box[2], previous_box[2]), max(box[3], previous_box[3]))
+            changed = changed_box(pixels, previous, box)
+            
+            digest = hashlib.blake2b(pixels.data, digest_size=16).hexdigest()
+            duplicate_of = seen.setdefault(digest, record.index)
+            duplicate_of = None if duplicate_of == record.index else duplicate_of
+            
+            color_table_bytes = 3 * descriptor.color_table_size if descriptor.local_color_table_flag else 0
+            encoded = encoded_size(len(record.data), color_table_bytes, record.control is not None)
+            declared_area = descriptor.width * descriptor.height
+            if changed is None and record.index:
+                wasted = encoded
+            elif changed is not None and declared_area:
+                # LZW data is attributed to the declared rectangle in proportion to its area
+                wasted = int(len(record.data) * (1 - changed[2] * changed[3] / declared_area))
+                wasted = max(0, wasted)
+            else:
+                wasted = 0
+            
+            change = FrameChange(
+                record.index, digest, duplicate_of,
+                (descriptor.left, descriptor.top, descriptor.width, descriptor.height),
+                changed, encoded, wasted
+            )
+            self.changes.append(change)
+            yield change
+            
+            previous[...] = pixels
+            disposes = record.control is not None and record.control.disposal_method in (DISPOSE_TO_BACKGROUND, DISPOSE_TO_PREVIOUS)
+            previous_box = frame_box if disposes else None
+    
+    def summary(self) -> dict[str, int | float | list]:
+        changes = self.changes
+        encoded = sum(change.encoded_bytes for change in changes)
+        wasted = sum(change.wasted_bytes for change in changes)
+        return {
+            'duplicate_frames': sum(change.duplicate_of is not None for change in changes),
+            'unchanged_frames': sum(change.changed is None for change in changes),
+            'encoded_bytes': encoded,
+            'wasted_bytes': wasted,
+            'wasted_ratio': round(wasted / encoded, 6) if encoded else 0.0,
+            'frames': [
+                {
+                    'index': change.index,
+                    'duplicate_of': change.duplicate_of,
+                    'declared': list(change.declared),
+                    'changed': list(change.changed) if change.changed else None,
+                    'encoded_bytes': change.encoded_bytes,
+                    'wasted_bytes': change.wasted_bytes
+                }
+                for change in changes
+            ]
+        }
@@ -0,0 +1,128 @@
+import struct
+from typing import BinaryIO
+from gif_decoder import MAX_CODES, MAX_CODE_SIZE
+from gif_stream import (
+    IMAGE_SEPARATOR, EXTENSION_INTRODUCER, TRAILER, GRAPHICS_CONTROL_LABEL, APPLICATION_LABEL
+)
+
+# Whole bytes are moved out of the bit buffer once it holds this many bits
+FLUSH_BITS = 4096
+SUB_BLOCK_SIZE = 255
+
+_SCREEN = struct.Struct('<6sHHBBB')
+_GRAPHICS_CONTROL = struct.Struct('<BBBBHBB')
+_IMAGE_DESCRIPTOR = struct.Struct('<BHHHHB')
+
+def encode_lzw(indices: bytes | bytearray | memoryview, min_code_size: int) -> bytes:
+    clear_code = 1 << min_code_size
+    end_code = clear_code + 1
+    code_size = min_code_size + 1
+    next_code = end_code + 1
+    # Strings are keyed by prefix code and next index packed into one int, which hashes faster than tuples
+    table: dict[int, int] = {}
+    get = table.get
+    out = bytearray()
+    bits = clear_code
+    bit_count = code_size
+    
+    pixels = iter(memoryview(indices).cast('B'))
+    prefix = next(pixels, None)
+    if prefix is None:
+        bits |= end_code << bit_count
+        bit_count += code_size
+        return (bits & ((1 << bit_count) - 1)).to_bytes((bit_count + 7) >> 3, 'little')
+    
+    for pixel in pixels:
+        key = prefix << 8 | pixel
+        code = get(key)
+        if code is not None:
+            prefix = code
+            continue
+        
+        bits |= prefix << bit_count
+        bit_count += code_size
+        prefix = pixel
+        
+        if next_code < MAX_CODES:
+            table[key] = next_code
+            # The decoder adds each entry one code later, so the width grows once the table passes the limit
+            if next_code == 1 << code_size:
+                code_size += 1
+            next_code += 1
+        else:
+            bits |= clear_code << bit_count
+            bit_count += code_size
+            table.clear()
+            code_size = min_code_size + 1
+            next_code = end_code + 1
+        
+        if bit_count >= FLUSH_BITS:
+            whole = bit_count >> 3
+            out += (bits & ((1 << (whole << 3)) - 1)).to_bytes(whole, 'little')
+            bits >>= whole << 3
+            bit_count -= whole << 3
+    
+    bits |= prefix << bit_count
+    bit_count += code_size
+    if next_code == 1 << code_size and code_size < MAX_CODE_SIZE:
+        code_size += 1
+    bits |= end_code << bit_count
+    bit_count += code_size
+    out += (bits & ((1 << bit_count) - 1)).to_bytes((bit_count + 7) >> 3, 'little')
+    return bytes(out)
+
+def sub_blocks(data: bytes | bytearray | memoryview) -> bytes:
+    view = memoryview(data)
+    out = bytearray()
+    for start in range(0, len(view), SUB_BLOCK_SIZE):
+        block = view[start:start + SUB_BLOCK_SIZE]
+        out.append(len(block))
+        out += block
+    out.append(0)
+    return bytes(out)
+
+def table_bits(table: bytes) -> int:
+    # Color table size as stored in the packed fields: 2 ** (bits + 1) entries
+    return max(0, (len(table) // 3 - 1).bit_length() - 1)
+
+class GifWriter:
+    def __init__(self, out: BinaryIO, width: int, height: int, global_color_table: bytes | None = None,
+                 background_color: int = 0, loop_count: int | None = None):
+        self._out: BinaryIO = out
+        self._global_color_table: bytes | None = global_color_table
+        self.bytes_written: int = 0
+        
+        packed = 0b01110000
+        if global_color_table:
+            packed |= 0b10000000 | table_bits(global_color_table)
+        self._write(_SCREEN.pack(b'GIF89a', width, height, packed, background_color if global_color_table else 0, 0))
+        if global_color_table:
+            self._write(global_color_table)
+        if loop_count is not None:
+            self._write(bytes((EXTENSION_INTRODUCER, APPLICATION_LABEL, 11)) + b'NETSCAPE2.0')
+            self._write(struct.pack('<BBHB', 3, 1, loop_count, 0))
+    
+    def write_frame(self, indices: bytes | bytearray | memoryview, left: int, top: int, width: int, height: int,
+                    delay: int = 0, disposal_method: int = 0, transparent_index: int | None = None,
+                    color_table: bytes | None = None) -> None:
+        packed = disposal_method << 2 | (transparent_index is not None)
+        self._write(_GRAPHICS_CONTROL.pack(
+            EXTENSION_INTRODUCER, GRAPHICS_CONTROL_LABEL, 4, packed, min(delay, 0xFFFF), transparent_index or 0, 0
+        ))
+        
+        table = color_table or self._global_color_table or bytes(6)
+        packed = 0b10000000 | table_bits(color_table) if color_table else 0
+        self._write(_IMAGE_DESCRIPTOR.pack(IMAGE_SEPARATOR, left, top, width, height, packed))
+        if color_table:
+            self._write(color_table)
+        
+        min_code_size = max(2, table_bits(table) + 1)
+        self._write(bytes((min_code_size,)))
+        self._write(sub_blocks(encode_lzw(indices, min_code_size)))
+    
+    def close(self) -> None:
+        self._write(bytes((TRAILER,)))
+    
+    def _write(self, data: bytes) -> None:
+        self._out.write(data)
+        self.bytes_written += len(data)
@@ -0,0 +1,94 @@
+import mmap
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Sequence
+import numpy as np
+from gif_decoder import GifDecoder, EncodedFrame
+from gif_compositor import Canvas, Checkpoint
+from gif_index import FrameIndex
+from gif_stream import LogicalScreenDescriptor
+
+class FrameCache:
+    MIN_CHECKPOINT_INTERVAL: int = 8
+    
+    def __init__(self, source: Path | str | bytes | bytearray | memoryview | BinaryIO,
+                 memory_budget: int = 256 * 1024 * 1024, checkpoint_budget: int = 128 * 1024 * 1024,
+                 index: FrameIndex | None = None, size: tuple[int, int] | None = None):
+        self._mapped: mmap.mmap | None = None
+        if index is not None and len(index):
+            # Frames are read straight from the mapped file instead of being held in memory
+            with open(source, 'rb') as f:
+                self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.records: Sequence[EncodedFrame] = index.records(self._mapped)
+            self.screen: LogicalScreenDescriptor | None = index.screen(self._mapped)
+            self.loop_count: int | None = index.loop_count
+        else:
+            decoder = GifDecoder(source)
+            self.records = list(decoder.records())
+            self.screen = decoder.screen
+            self.loop_count = decoder.loop_count
+        
+        # Frames are composited at size (width, height) when given, sampled from the full canvas
+        self.size: tuple[int, int] | None = size or ((self.screen.width, self.screen.height) if self.screen else None)
+        frame_bytes = max(1, self.size[0] * self.size[1] * 4) if self.size else 1
+        self.capacity: int = max(2, memory_budget // frame_bytes)
+        self.checkpoint_interval: int = max(self.MIN_CHECKPOINT_INTERVAL, -(-len(self.records) * frame_bytes // checkpoint_budget))
+        
+        self._frames: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._checkpoints: dict[int, Checkpoint] = {}
+        self._canvas: Canvas | None = Canvas(self.screen, size=self.size) if self.records else None
+        self._position: int = 0
+        self._lock = threading.Lock()
+        
+        if self._canvas is not None:
+            self._checkpoints[0] = self._canvas.checkpoint()
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def cached(self, index: int) -> bool:
+        return index in self._frames
+    
+    def get(self, index: int) -> np.ndarray:
+        with self._lock:
+            pixels = self._frames.get(index)
+            if pixels is not None:
+                self._frames.move_to_end(index)
+                return pixels
+            
+            self._seek(index)
+            while self._position <= index:
+                pixels = self._draw_next()
+            return pixels
+    
+    def close(self) -> None:
+        if self._mapped is not None:
+            with self._lock:
+                self._mapped.close()
+                self._mapped = None
+    
+    def _seek(self, index: int) -> None:
+        nearest = index - index % self.checkpoint_interval
+        while nearest not in self._checkpoints:
+            nearest -= self.checkpoint_interval
+        
+        if self._position <= index and nearest <= self._position:
+            return
+        
+        self._canvas.restore(self._checkpoints[nearest])
+        self._position = nearest
+    
+    def _draw_next(self) -> np.ndarray:
+        index = self._position
+        pixels = self._canvas.draw(self.records[index].decode()).copy()
+        self._position += 1
+        
+        if self._position % self.checkpoint_interval == 0 and self._position not in self._checkpoints:
+            self._checkpoints[self._position] = self._canvas.checkpoint()
+        
+        self._frames[index] = pixels
+        self._frames.move_to_end(index)
+        while len(self._frames) > self.capacity:
+            self._frames.popitem(last=False)
+        return pixels
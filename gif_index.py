@@ -0,0 +1,179 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterator, Sequence
+from gif_decoder import EncodedFrame
+from gif_parser import GifParser
+from gif_stream import (
+    GifStreamParser, GifFormatError, LogicalScreenDescriptor, GraphicsControlExtension,
+    ImageDescriptor, ImageData
+)
+
+INDEX_MAGIC = b'GIFX'
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.idx'
+
+# magic, version, file size, file mtime, header length, loop count (-1 = none), frame count
+_INDEX_HEADER = struct.Struct("<4sHQqQqQ")
+
+# Per-frame columns, -1 where a frame has no graphic control extension
+_COLUMNS = ('offsets', 'lengths', 'data_offsets', 'control_offsets')
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+class FrameIndex:
+    def __init__(self, size: int, mtime_ns: int, header_length: int, loop_count: int | None,
+                 offsets: array, lengths: array, data_offsets: array, control_offsets: array):
+        self.size: int = size
+        self.mtime_ns: int = mtime_ns
+        self.header_length: int = header_length
+        self.loop_count: int | None = loop_count
+        self.offsets: array = offsets
+        self.lengths: array = lengths
+        self.data_offsets: array = data_offsets
+        self.control_offsets: array = control_offsets
+    
+    @staticmethod
+    def sidecar_path(path: Path) -> Path:
+        return path.with_name(path.name + INDEX_SUFFIX)
+    
+    @classmethod
+    def from_parser(cls, parser: GifParser, stat: os.stat_result) -> 'FrameIndex':
+        blocks = parser.blocks
+        header_length = blocks[0].length if blocks and blocks[0].block_type == 0 else 0
+        frames = parser.frames
+        return cls(
+            stat.st_size, stat.st_mtime_ns, header_length, parser.get_summary()['loop_count'],
+            array('q', (frame.offset for frame in frames)),
+            # A truncated last frame runs to the end of the file
+            array('q', (stat.st_size - frame.offset if frame.length is None else frame.length for frame in frames)),
+            array('q', (frame.data_offset for frame in frames)),
+            array('q', (-1 if frame.control_offset is None else frame.control_offset for frame in frames))
+        )
+    
+    @classmethod
+    def build(cls, path: Path) -> 'FrameIndex':
+        parser = GifParser(path)
+        stat = path.stat()
+        parser.parse_file()
+        return cls.from_parser(parser, stat)
+    
+    @classmethod
+    def load(cls, path: Path, index_path: Path | None = None) -> 'FrameIndex | None':
+        index_path = index_path or cls.sidecar_path(path)
+        try:
+            data = index_path.read_bytes()
+            stat = path.stat()
+        except OSError:
+            return None
+        if len(data) < _INDEX_HEADER.size:
+            return None
+        
+        magic, version, size, mtime_ns, header_length, loop_count, count = _INDEX_HEADER.unpack_from(data)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            return None
+        if size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+            return None
+        if len(data) != _INDEX_HEADER.size + len(_COLUMNS) * 8 * count:
+            return None
+        
+        columns = []
+        position = _INDEX_HEADER.size
+        for _ in _COLUMNS:
+            column = array('q')
+            column.frombytes(data[position:position + 8 * count])
+            columns.append(_little_endian(column))
+            position += 8 * count
+        return cls(size, mtime_ns, header_length, None if loop_count < 0 else loop_count, *columns)
+    
+    @classmethod
+    def open(cls, path: Path, save: bool = True) -> 'FrameIndex':
+        index = cls.load(path)
+        if index is None:
+            index = cls.build(path)
+            if save:
+                try:
+                    index.save(cls.sidecar_path(path))
+                except OSError:
+                    pass
+        return index
+    
+    def save(self, index_path: Path) -> None:
+        header = _INDEX_HEADER.pack(
+            INDEX_MAGIC, INDEX_VERSION, self.size, self.mtime_ns, self.header_length,
+            -1 if self.loop_count is None else self.loop_count, len(self)
+        )
+        # Written next to the target and renamed so readers never see a partial index
+        temporary = index_path.with_name(index_path.name + '.tmp')
+        with open(temporary, 'wb') as f:
+            f.write(header)
+            for name in _COLUMNS:
+                _little_endian(getattr(self, name)).tofile(f)
+        os.replace(temporary, index_path)
+    
+    def __len__(self) -> int:
+        return len(self.offsets)
+    
+    def span(self, index: int) -> tuple[int, int]:
+        control_offset = self.control_offsets[index]
+        offset = self.offsets[index]
+        return (offset if control_offset < 0 else control_offset), offset + self.lengths[index]
+    
+    def screen(self, buffer: bytes | bytearray | memoryview | mmap.mmap) -> LogicalScreenDescriptor | None:
+        for event in GifStreamParser().feed(buffer[:self.header_length]):
+            if isinstance(event, LogicalScreenDescriptor):
+                return event
+        return None
+    
+    def header(self, buffer: bytes | bytearray | memoryview | mmap.mmap, index: int) -> tuple[ImageDescriptor, GraphicsControlExtension | None]:
+        # Stops right after the LZW minimum code size byte, so no image data is read
+        start = self.span(index)[0]
+        control = None
+        for event in GifStreamParser(body=True).feed(buffer[start:self.data_offsets[index] + 1]):
+            if isinstance(event, GraphicsControlExtension):
+                control = event
+            elif isinstance(event, ImageDescriptor):
+                return event, control
+        raise GifFormatError(f"Frame {index} does not match the index")
+    
+    def record(self, buffer: bytes | bytearray | memoryview | mmap.mmap, index: int) -> EncodedFrame:
+        start, end = self.span(index)
+        control = None
+        descriptor = None
+        blocks: list[bytes] = []
+        
+        for event in GifStreamParser(image_data=True, body=True).feed(buffer[start:end]):
+            if isinstance(event, ImageData):
+                blocks.append(event.data)
+            elif isinstance(event, ImageDescriptor):
+                descriptor = event
+            elif isinstance(event, GraphicsControlExtension):
+                control = event
+        return EncodedFrame(index, descriptor, control, b''.join(blocks))
+    
+    def records(self, buffer: bytes | bytearray | memoryview | mmap.mmap) -> 'IndexedRecords':
+        return IndexedRecords(self, buffer)
+
+class IndexedRecords(Sequence[EncodedFrame]):
+    def __init__(self, index: FrameIndex, buffer: bytes | bytearray | memoryview | mmap.mmap):
+        self._index: FrameIndex = index
+        self._buffer = buffer
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def __getitem__(self, index: int) -> EncodedFrame:
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return self._index.record(self._buffer, index % len(self))
+    
+    def __iter__(self) -> Iterator[EncodedFrame]:
+        for index in range(len(self)):
+            yield self._index.record(self._buffer, index)
@@ -0,0 +1,79 @@
+import queue
+import threading
+import time
+from pathlib import Path
+from gif_cache import AnalysisCache
+from gif_frame_cache import FrameCache
+from gif_index import FrameIndex
+from gif_parser import GifParser
+
+# Seconds between progress messages while the remaining frames are decoded
+PROGRESS_INTERVAL = 0.1
+
+# Messages are (kind, payload): ('ready', FrameCache) once the first frame is decoded, ('delays', per-frame
+# delays in ms, None without a graphic control extension), ('info', get_info() dict),
+# ('progress', (decoded, total)) while the other frames are decoded and ('done', None), or ('error', message)
+class LoadJob:
+    def __init__(self, path: Path | str, analysis_cache: AnalysisCache | None = None):
+        self.path: Path = Path(path)
+        self.messages: queue.SimpleQueue = queue.SimpleQueue()
+        self.frame_cache: FrameCache | None = None
+        self.index: FrameIndex | None = None
+        self.finished: bool = False
+        self._analysis_cache: AnalysisCache | None = analysis_cache
+        self._cancelled = threading.Event()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    def cancel(self) -> None:
+        self._cancelled.set()
+    
+    def run(self) -> None:
+        try:
+            self._load()
+        except Exception as e:
+            if not self.cancelled:
+                self.messages.put(('error', str(e)))
+        finally:
+            self.finished = True
+    
+    def _load(self) -> None:
+        path = self.path
+        if self._analysis_cache is not None:
+            parser, _ = self._analysis_cache.analyze(path)
+        else:
+            parser = GifParser(path)
+            parser.parse_file()
+        if self.cancelled:
+            return
+        
+        # The parse already has every frame offset, so a missing sidecar index is never rebuilt
+        index = FrameIndex.load(path) or FrameIndex.from_parser(parser, path.stat())
+        self.index = index
+        frame_cache = FrameCache(path, index=index)
+        self.frame_cache = frame_cache
+        if self.cancelled:
+            frame_cache.close()
+            return
+        
+        total = len(frame_cache)
+        if total:
+            frame_cache.get(0)
+        self.messages.put(('ready', frame_cache))
+        self.messages.put(('delays', [frame.delay_ms for frame in parser.frames]))
+        self.messages.put(('info', parser.get_info()))
+        
+        # Decoding ahead leaves checkpoints behind, so seeking stays cheap once playback starts
+        reported = time.perf_counter()
+        for i in range(1, total):
+            if self.cancelled:
+                return
+            frame_cache.get(i)
+            now = time.perf_counter()
+            if now - reported >= PROGRESS_INTERVAL:
+                self.messages.put(('progress', (i + 1, total)))
+                reported = now
+        self.messages.put(('progress', (total, total)))
+        self.messages.put(('done', None))
@@ -0,0 +1,231 @@
+import io
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import BinaryIO
+import numpy as np
+from gif_compositor import GifCompositor, DISPOSE_TO_BACKGROUND
+from gif_encoder import GifWriter
+from gif_parser import GifParser
+from gif_stream import ImageDescriptor, EXTENSION_INTRODUCER, APPLICATION_LABEL, COMMENT_LABEL, PLAIN_TEXT_LABEL
+
+DO_NOT_DISPOSE = 1
+# Blocks that do not change what is shown; the loop count is written again on its own
+DROPPED_LABELS = (COMMENT_LABEL, APPLICATION_LABEL, PLAIN_TEXT_LABEL)
+
+@dataclass(slots=True)
+class OptimizeResult:
+    input_bytes: int
+    output_bytes: int
+    input_frames: int
+    output_frames: int
+    merged_frames: int
+    dropped_blocks: int
+    input_local_tables: int
+    output_local_tables: int
+    encode_seconds: float
+    seconds: float
+    # Set when re-encoding gave no smaller file and the original bytes were written instead
+    kept_original: bool = False
+    
+    @property
+    def saved_ratio(self) -> float:
+        return 1 - self.output_bytes / self.input_bytes if self.input_bytes else 0.0
+    
+    def as_dict(self) -> dict[str, int | float]:
+        return asdict(self)
+
+@dataclass(slots=True)
+class PendingFrame:
+    # (top, bottom, left, right) on the canvas
+    box: tuple[int, int, int, int]
+    indices: np.ndarray
+    delay: int
+    transparent_index: int | None
+    color_table: bytes | None
+    disposal_method: int = DO_NOT_DISPOSE
+
+def bounding_box(mask: np.ndarray) -> tuple[int, int, int, int] | None:
+    rows = np.flatnonzero(mask.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    return int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1
+
+def new_color_table(colors: np.ndarray, transparency: bool) -> bytes:
+    # The transparent index goes after the colors; tables hold a power of two of at least 2 entries
+    if len(colors) + transparency > 256:
+        raise ValueError(f"Changed region needs {len(colors)} colors, more than one color table holds")
+    entries = max(2, 1 << (len(colors) + transparency - 1).bit_length())
+    table = np.zeros((entries, 3), np.uint8)
+    table[:len(colors)] = colors.view(np.uint8).reshape(-1, 4)[:, :3]
+    return table.tobytes()
+
+def table_pixels(table: bytes) -> np.ndarray:
+    # Table entries as opaque canvas pixels, so they compare directly with the canvas viewed as uint32
+    entries = np.frombuffer(table, np.uint8)
+    pixels = np.full((len(entries) // 3, 4), 255, np.uint8)
+    pixels[:, :3] = entries[:len(pixels) * 3].reshape(-1, 3)
+    return pixels.view(np.uint32).ravel()
+
+class GifOptimizer:
+    def __init__(self, source: Path | str):
+        self._source: Path = Path(source)
+        # Sorted table pixels and their table positions per distinct color table
+        self._tables: dict[bytes, tuple[np.ndarray, np.ndarray]] = {}
+    
+    def optimize(self, out: BinaryIO) -> OptimizeResult:
+        start = time.perf_counter()
+        parser = GifParser(self._source)
+        parser.parse_file()
+        dropped_blocks = sum(
+            1 for block in parser.blocks if block.block_type == EXTENSION_INTRODUCER and block.label in DROPPED_LABELS
+        )
+        
+        compositor = GifCompositor(self._source)
+        # Encoded into memory first, so the original can still be written if nothing is saved
+        encoded = io.BytesIO()
+        writer = None
+        shown = None
+        pending = None
+        output_frames = merged_frames = output_local_tables = 0
+        encode_seconds = 0.0
+        
+        for composited in compositor.frames():
+            # One uint32 per RGBA pixel turns every comparison into a single pass; transparent pixels are 0
+            target = composited.canvas.view(np.uint32)[..., 0]
+            frame = composited.frame
+            delay = frame.control.delay if frame.control is not None else 0
+            if writer is None:
+                screen = compositor.screen
+                writer = GifWriter(encoded, screen.width, screen.height, screen.global_color_table,
+                                   screen.background_color, compositor.loop_count)
+                shown = np.zeros_like(target)
+            
+            changed = target != shown
+            box = bounding_box(changed)
+            if box is None and pending is not None:
+                pending.delay += delay
+                merged_frames += 1
+                continue
+            
+            # Pixels that turn transparent can only be cleared by disposing the frame before
+            cleared = bounding_box(changed & (target == 0))
+            if cleared is not None:
+                pending.box = self._grow(pending, cleared)
+                pending.disposal_method = DISPOSE_TO_BACKGROUND
+                top, bottom, left, right = pending.box
+                shown[top:bottom, left:right] = 0
+                changed = target != shown
+                box = bounding_box(changed)
+            
+            if pending is not None:
+                encode_seconds += self._write(writer, pending)
+                output_frames += 1
+            # A first frame that shows nothing still needs an image
+            pending = self._encode(target, changed, box or (0, 1, 0, 1), frame.descriptor, delay, compositor.screen.global_color_table)
+            output_local_tables += pending.color_table is not None
+            shown[...] = target
+        
+        if writer is None:
+            raise ValueError("GIF has no frames to optimize")
+        encode_seconds += self._write(writer, pending)
+        output_frames += 1
+        writer.close()
+        
+        input_bytes = self._source.stat().st_size
+        input_local_tables = sum(frame.local_color_table for frame in parser.frames)
+        if writer.bytes_written >= input_bytes:
+            out.write(self._source.read_bytes())
+            return OptimizeResult(
+                input_bytes, input_bytes, len(parser.frames), len(parser.frames), 0, 0, input_local_tables, input_local_tables,
+                encode_seconds, time.perf_counter() - start, True
+            )
+        out.write(encoded.getbuffer())
+        return OptimizeResult(
+            input_bytes, writer.bytes_written, len(parser.frames), output_frames, merged_frames, dropped_blocks,
+            input_local_tables, output_local_tables, encode_seconds, time.perf_counter() - start
+        )
+    
+    def _grow(self, pending: PendingFrame, box: tuple[int, int, int, int]) -> tuple[int, int, int, int]:
+        # Widen the pending frame with transparent pixels so its disposal clears the whole box
+        if pending.transparent_index is None:
+            raise ValueError("Cannot clear pixels after a frame that uses all 256 colors")
+        top, bottom, left, right = pending.box
+        grown = min(top, box[0]), max(bottom, box[1]), min(left, box[2]), max(right, box[3])
+        indices = np.full((grown[1] - grown[0], grown[3] - grown[2]), pending.transparent_index, np.uint8)
+        indices[top - grown[0]:bottom - grown[0], left - grown[2]:right - grown[2]] = pending.indices
+        pending.indices = indices
+        return grown
+    
+    def _encode(self, target: np.ndarray, changed: np.ndarray, box: tuple[int, int, int, int],
+                descriptor: ImageDescriptor, delay: int, global_color_table: bytes | None) -> PendingFrame:
+        top, bottom, left, right = box
+        keys = target[top:bottom, left:right]
+        mask = changed[top:bottom, left:right]
+        colors, inverse = np.unique(keys[mask], return_inverse=True)
+        
+        # The global table is preferred, so local tables that only repeat its colors are dropped
+        tables = [(global_color_table, None)]
+        if descriptor.local_color_table_flag:
+            tables.append((descriptor.local_color_table, descriptor.local_color_table))
+        tables = [(table, color_table) for table, color_table in tables if table]
+        
+        # Unchanged pixels are left transparent whenever a table has an entry to spare for it
+        for table, color_table in tables:
+            mapping = self._map_colors(table, colors, True)
+            if mapping is not None:
+                break
+        else:
+            color_table = new_color_table(colors, True) if len(colors) < 256 else None
+            mapping = (np.arange(len(colors), dtype=np.uint8), len(colors)) if color_table else None
+        if mapping is not None:
+            lookup, transparent_index = mapping
+            indices = np.full(keys.shape, transparent_index, np.uint8)
+            indices[mask] = lookup[inverse.ravel()]
+            return PendingFrame(box, indices, delay, transparent_index, color_table)
+        
+        # With all 256 entries in use the whole box is drawn opaque
+        if not keys.all():
+            raise ValueError("Changed region needs 256 colors and transparency, more than one color table holds")
+        colors, inverse = np.unique(keys, return_inverse=True)
+        for table, color_table in tables:
+            mapping = self._map_colors(table, colors, False)
+            if mapping is not None:
+                break
+        else:
+            color_table = new_color_table(colors, False)
+            mapping = np.arange(len(colors), dtype=np.uint8), None
+        lookup = mapping[0]
+        return PendingFrame(box, lookup[inverse.reshape(keys.shape)], delay, None, color_table)
+    
+    def _map_colors(self, table: bytes, colors: np.ndarray, transparency: bool) -> tuple[np.ndarray, int | None] | None:
+        entry = self._tables.get(table)
+        if entry is None:
+            keys = table_pixels(table)
+            order = np.argsort(keys, kind='stable')
+            entry = self._tables[table] = keys[order], order
+        keys, order = entry
+        
+        positions = np.minimum(np.searchsorted(keys, colors), len(keys) - 1)
+        if len(colors) and not np.array_equal(keys[positions], colors):
+            return None
+        lookup = order[positions].astype(np.uint8)
+        if not transparency:
+            return lookup, None
+        # Any entry no changed pixel maps to can serve as the transparent index
+        free = np.ones(len(keys), bool)
+        free[lookup] = False
+        spare = np.flatnonzero(free)
+        if not len(spare):
+            return None
+        return lookup, int(spare[0])
+    
+    def _write(self, writer: GifWriter, pending: PendingFrame) -> float:
+        start = time.perf_counter()
+        top, bottom, left, right = pending.box
+        writer.write_frame(
+            pending.indices.tobytes(), left, top, right - left, bottom - top,
+            pending.delay, pending.disposal_method, pending.transparent_index, pending.color_table
+        )
+        return time.perf_counter() - start
@@ -0,0 +1,116 @@
+import mmap
+import os
+from multiprocessing import Pool, shared_memory
+from pathlib import Path
+from typing import Iterator
+from gif_compositor import Canvas, CompositedFrame
+from gif_decoder import DecodedFrame, decode_image
+from gif_index import FrameIndex
+from gif_stream import LogicalScreenDescriptor
+
+# Worker state set up once per process by _init_worker
+_index: FrameIndex | None = None
+_mapped: mmap.mmap | None = None
+_arena: shared_memory.SharedMemory | None = None
+
+def _init_worker(path: Path, index: FrameIndex, arena_name: str) -> None:
+    global _index, _mapped, _arena
+    with open(path, 'rb') as f:
+        _mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _index = index
+    _arena = shared_memory.SharedMemory(arena_name)
+
+def _decode_batch(batch: list[tuple[int, int]]) -> int:
+    buffer = _arena.buf
+    for frame_index, position in batch:
+        record = _index.record(_mapped, frame_index)
+        indices = decode_image(record.descriptor, record.data)
+        buffer[position:position + len(indices)] = indices
+    return len(batch)
+
+class ParallelDecoder:
+    def __init__(self, path: Path | str, workers: int | None = None, index: FrameIndex | None = None,
+                 arena_budget: int = 256 * 1024 * 1024, batch_pixels: int = 1024 * 1024):
+        self.path: Path = Path(path)
+        self.workers: int = workers or os.cpu_count() or 1
+        self.index: FrameIndex = index or FrameIndex.open(self.path, save=False)
+        self.arena_budget: int = arena_budget
+        self.batch_pixels: int = batch_pixels
+        self.screen: LogicalScreenDescriptor | None = None
+        self.loop_count: int | None = self.index.loop_count
+    
+    def frames(self, copy: bool = False) -> Iterator[CompositedFrame]:
+        index = self.index
+        if not len(index):
+            return
+        
+        with open(self.path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                self.screen = index.screen(mapped)
+                headers = [index.header(mapped, i) for i in range(len(index))]
+        
+        sizes = [descriptor.width * descriptor.height for descriptor, _ in headers]
+        total = sum(sizes)
+        # A file that does not fit is decoded into two halves of the arena in turn
+        region = max(1, total) if total <= self.arena_budget else max(self.arena_budget // 2, max(sizes))
+        regions = 1 if total <= self.arena_budget else 2
+        arena = shared_memory.SharedMemory(create=True, size=region * regions)
+        canvas = Canvas(self.screen)
+        # Several batches per worker keep them all busy, while batching several frames per task keeps the overhead down
+        batch_pixels = max(1, min(self.batch_pixels, total // (self.workers * 4)))
+        
+        try:
+            with Pool(self.workers, _init_worker, (self.path, index, arena.name)) as pool:
+                windows = self._windows(sizes, region, regions, batch_pixels)
+                window = next(windows)
+                pending = (window, pool.imap(_decode_batch, window))
+                while pending is not None:
+                    window, results = pending
+                    # The next window is queued before this one is composited, so the workers never wait for the compositor
+                    following = next(windows, None)
+                    pending = (following, pool.imap(_decode_batch, following)) if following is not None else None
+                    # Batches come back in order, so compositing overlaps decoding of later batches
+                    for batch, _ in zip(window, results):
+                        for frame_index, position in batch:
+                            descriptor, control = headers[frame_index]
+                            indices = arena.buf[position:position + sizes[frame_index]]
+                            try:
+                                # Without copy the indices are only valid until the next frame is requested
+                                frame = DecodedFrame(frame_index, descriptor, control, bytearray(indices) if copy else indices)
+                                pixels = canvas.draw(frame)
+                                yield CompositedFrame(frame_index, frame, pixels.copy() if copy else pixels)
+                            finally:
+                                indices.release()
+        finally:
+            arena.close()
+            arena.unlink()
+    
+    def _windows(self, sizes: list[int], region: int, regions: int, batch_pixels: int) -> Iterator[list[list[tuple[int, int]]]]:
+        # Frames are laid out back to back in one region of the arena; a window ends when its region is full
+        # and the next one starts in the following region
+        window: list[list[tuple[int, int]]] = []
+        batch: list[tuple[int, int]] = []
+        base = position = batch_size = 0
+        
+        for frame_index, size in enumerate(sizes):
+            if position + size > base + region:
+                if batch:
+                    window.append(batch)
+                yield window
+                window, batch = [], []
+                base = (base + region) % (region * regions)
+                position = base
+                batch_size = 0
+            
+            batch.append((frame_index, position))
+            position += size
+            batch_size += size
+            if batch_size >= batch_pixels:
+                window.append(batch)
+                batch = []
+                batch_size = 0
+        
+        if batch:
+            window.append(batch)
+        if window:
+            yield window
@@ -1,6 +1,111 @@
-import struct
-from typing import BinaryIO
+import mmap
+import time
+from array import array
+from dataclasses import dataclass, field, fields, asdict
+from itertools import compress
+from operator import attrgetter
+from typing import BinaryIO, Iterable, Iterator
 from pathlib import Path
+from gif_archive import open_member, split_member
+from gif_stream import (
+    GifStreamParser, Event, Header, ScreenDescriptorRead, LogicalScreenDescriptor, GraphicsControlExtension,
+    ImageDescriptor, ApplicationExtension, CommentExtension, BlockSpan,
+    IMAGE_SEPARATOR, EXTENSION_INTRODUCER, PLAIN_TEXT_LABEL, GRAPHICS_CONTROL_LABEL, APPLICATION_LABEL, COMMENT_LABEL
+)
+
+# Image separator plus the fixed image descriptor fields
+IMAGE_DESCRIPTOR_SIZE = 10
+
+DISPOSAL_METHODS: tuple[str, ...] = (
+    "No disposal specified",
+    "Do not dispose",
+    "Restore to background",
+    "Restore to previous"
+)
+
+@dataclass(slots=True)
+class FrameRecord:
+    left: int
+    top: int
+    width: int
+    height: int
+    local_color_table: bool
+    interlaced: bool
+    sort_flag: bool
+    color_table_size: int
+    delay_ms: int | None = None
+    disposal_method: int | None = None
+    user_input: bool | None = None
+    transparency: bool | None = None
+    transparent_color: int | None = None
+    # Byte offsets of the image block, its LZW minimum code size byte and the preceding
+    # graphic control extension; length runs through the block terminator
+    offset: int | None = None
+    length: int | None = None
+    data_offset: int | None = None
+    control_offset: int | None = None
+    # Position of the local color table in GifParser.color_tables, shared by identical tables
+    color_table_id: int | None = None
+    
+    @property
+    def color_table_offset(self) -> int | None:
+        if self.offset is None or not self.local_color_table:
+            return None
+        return self.offset + IMAGE_DESCRIPTOR_SIZE
+    
+    def as_info(self) -> dict[str, str | tuple[int, int] | bool | int | None]:
+        if self.delay_ms is None:
+            return {
+                'Position': (self.left, self.top),
+                'Size': f"{self.width}x{self.height}",
+                'Local Color Table': self.local_color_table,
+                'Interlaced': self.interlaced,
+                'Sort Flag': self.sort_flag,
+                'Color Table Size': self.color_table_size
+            }
+        disposal_method = self.disposal_method
+        return {
+            'Position': (self.left, self.top),
+            'Size': f"{self.width}x{self.height}",
+            'Local Color Table': self.local_color_table,
+            'Interlaced': self.interlaced,
+            'Sort Flag': self.sort_flag,
+            'Color Table Size': self.color_table_size,
+            'Delay': f"{self.delay_ms}ms",
+            'Disposal Method': DISPOSAL_METHODS[disposal_method] if disposal_method < len(DISPOSAL_METHODS) else f"Unknown ({disposal_method})",
+            'User Input': self.user_input,
+            'Transparency': self.transparency,
+            'Transparent Color': self.transparent_color
+        }
+
+EXTENSION_NAMES: dict[int, str] = {
+    PLAIN_TEXT_LABEL: 'plain_text',
+    GRAPHICS_CONTROL_LABEL: 'graphic_control',
+    APPLICATION_LABEL: 'application',
+    COMMENT_LABEL: 'comment'
+}
+
+@dataclass(slots=True)
+class ParseStats:
+    bytes_read: int = 0
+    read_calls: int = 0
+    sub_blocks: int = 0
+    images: int = 0
+    extensions: dict[str, int] = field(default_factory=dict)
+    # Seconds spent in each phase: header, screen_descriptor, global_color_table, frames and report
+    timings: dict[str, float] = field(default_factory=dict)
+    
+    def as_dict(self) -> dict[str, int | dict[str, int | float]]:
+        return asdict(self)
+
+SCAN_FIELDS: tuple[str, ...] = (
+    'width', 'height', 'frame_count', 'loop_count', 'duration_ms', 'file_size', 'bytes_scanned', 'truncated', 'limit'
+)
+
+FRAME_FIELDS: tuple[str, ...] = tuple(field.name for field in fields(FrameRecord))
+frame_values = attrgetter(*FRAME_FIELDS)
+
+SCREEN_FIELDS: tuple[str, ...] = tuple(field.name for field in fields(LogicalScreenDescriptor) if field.name != 'global_color_table')
 
 class GifParser:
     # GIF Block Types
@@ -13,198 +118,304 @@ class GifParser:
     APPLICATION_LABEL: bytes = b'\xFF'
     COMMENT_LABEL: bytes = b'\xFE'
     
-    def __init__(self, file_path: Path):
-        self._file_path: Path = file_path
+    # Parsing backends
+    BACKENDS: tuple[str, ...] = ('mmap', 'file')
+    
+    CHUNK_SIZE: int = 65536
+    
+    DISPOSAL_METHODS: tuple[str, ...] = DISPOSAL_METHODS
+    
+    def __init__(self, file_path: Path | None = None, backend: str = 'mmap', stats: bool = False):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(self.BACKENDS)}")
+        self._file_path: Path | None = file_path
+        self._backend: str = backend
         self._width: int = 0
         self._height: int = 0
-        self._global_color_table: list[tuple[int, int, int]] = []
-        self._frames_info: list[dict[str, str | tuple[int, int] | bool | int | None]] = []
+        # Local color tables are stored once per distinct table
+        self._color_tables: list[bytes] = []
+        self._color_table_ids: dict[bytes, int] = {}
+        self._frames: list[FrameRecord] = []
+        self._screen: LogicalScreenDescriptor | None = None
+        self._loop_count: int | None = None
         self._headers_info: dict[str, dict[str, tuple[str | int | bool, str]]] = {}
         self._frame_count: int = 0
         self._file_size: int = 0
         self._total_duration: int = 0
-        self._global_color_table_flag: bool = False
-        self._global_color_table_size: int = 0
-        
+        self._pending_control: GraphicsControlExtension | None = None
+        self._pending_control_offset: int | None = None
+        self._comment: list[str] = []
+        # Flat (block type, label, offset, length) entries for every complete block
+        self._blocks: array = array('q')
+        self._stream: GifStreamParser | None = None
+        # Collected only on request; the phase timers are read once per phase, not per block
+        self._stats: ParseStats | None = ParseStats() if stats else None
+        # Color statistics from gif_colors.ColorStats.summary(), filled in by tools that decode the frames
+        self.colors: dict | None = None
+        # Duplicate frames, changed regions and wasted bytes from gif_diagnostics.FrameDiagnostics.summary()
+        self.diff: dict | None = None
+        self._mark: float = 0.0
+    
+    @property
+    def stats(self) -> ParseStats | None:
+        return self._stats
+    
     def parse_file(self) -> dict[str, dict | list | tuple | int]:
-        if not self._file_path.exists():
+        member = self._archive_member()
+        if member is not None:
+            with open_member(*member) as stream:
+                return self.parse_stream(stream)
+        if self._file_path is None or not self._file_path.exists():
             raise FileNotFoundError(f"File {self._file_path} not found")
-            
+        
         self._file_size = self._file_path.stat().st_size
         
         with self._file_path.open('rb') as f:
-            self._parse_header(f)
-            self._parse_logical_screen_descriptor(f)
-            self._parse_global_color_table(f)
-            self._parse_frames(f)
-            
+            if self._backend == 'file' or self._file_size == 0:
+                self._parse_chunks(iter(lambda: f.read(self.CHUNK_SIZE), b''))
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    self._parse_chunks((mapped,))
+        
+        return self.get_info()
+    
+    def parse_bytes(self, data: bytes | bytearray | memoryview) -> dict[str, dict | list | tuple | int]:
+        with memoryview(data).cast('B') as view:
+            self._file_size = view.nbytes
+            self._parse_chunks((view,))
         return self.get_info()
     
-    def _parse_header(self, f: BinaryIO) -> None:
-        header = f.read(6)
-        signature = header[:3].decode('ascii')
-        version = header[3:6].decode('ascii')
+    def parse_stream(self, stream: BinaryIO) -> dict[str, dict | list | tuple | int]:
+        self._parse_chunks(iter(lambda: stream.read(self.CHUNK_SIZE), b''), count_size=True)
+        return self.get_info()
+    
+    def scan(self, max_frames: int | None = None, max_bytes: int | None = None,
+             deadline: float | None = None) -> dict[str, int | bool | str | None]:
+        member = self._archive_member()
+        if member is not None:
+            with open_member(*member) as stream:
+                return self.scan_stream(stream, max_frames, max_bytes, deadline)
+        if self._file_path is None or not self._file_path.exists():
+            raise FileNotFoundError(f"File {self._file_path} not found")
         
-        self._headers_info['Header'] = {
-            'Signature': (signature, 'GIF signature'),
-            'Version': (version, 'GIF version')
-        }
+        size = self._file_path.stat().st_size
+        with self._file_path.open('rb') as f:
+            if size == 0:
+                return self._scan((), size, max_frames, max_bytes, deadline)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                return self._scan(self._slices(view), size, max_frames, max_bytes, deadline)
     
-    def _parse_logical_screen_descriptor(self, f: BinaryIO) -> None:
-        self._width, self._height = struct.unpack("<HH", f.read(4))
-        packed = struct.unpack("<B", f.read(1))[0]
-        background_color = struct.unpack("<B", f.read(1))[0]
-        aspect_ratio = struct.unpack("<B", f.read(1))[0]
+    def scan_stream(self, stream: BinaryIO, max_frames: int | None = None, max_bytes: int | None = None,
+                    deadline: float | None = None) -> dict[str, int | bool | str | None]:
+        return self._scan(iter(lambda: stream.read(self.CHUNK_SIZE), b''), None, max_frames, max_bytes, deadline)
+    
+    def _archive_member(self) -> tuple[Path, str] | None:
+        # archive!member paths are read from the archive stream instead of from disk
+        if self._file_path is None or self._file_path.exists():
+            return None
+        return split_member(self._file_path)
+    
+    def _slices(self, view: memoryview) -> Iterator[memoryview]:
+        for start in range(0, len(view), self.CHUNK_SIZE):
+            with view[start:start + self.CHUNK_SIZE] as chunk:
+                yield chunk
+    
+    def _scan(self, chunks: Iterable[bytes | memoryview], size: int | None, max_frames: int | None,
+              max_bytes: int | None, deadline: float | None) -> dict[str, int | bool | str | None]:
+        # Walks the blocks without building frame records; deadline is in seconds from now
+        if max_frames is not None and max_frames < 1 or max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_frames and max_bytes must be at least 1")
+        expires = time.monotonic() + deadline if deadline is not None else None
+        parser = GifStreamParser()
+        screen = None
+        frame_count = duration = delay = 0
+        loop_count = None
+        limit = None
         
-        global_color_table_flag = bool(packed & 0b10000000)
-        color_resolution = ((packed & 0b01110000) >> 4) + 1
-        sort_flag = bool(packed & 0b00001000)
-        global_color_table_size = 2 << (packed & 0b00000111)
+        for chunk in chunks:
+            cut = max_bytes is not None and parser.offset + len(chunk) > max_bytes
+            if cut:
+                chunk = chunk[:max(0, max_bytes - parser.offset)]
+            for event in parser.feed(chunk):
+                if isinstance(event, ImageDescriptor):
+                    # The file is only cut short once a frame beyond the limit turns up
+                    if frame_count == max_frames:
+                        limit = 'max_frames'
+                        break
+                    frame_count += 1
+                    duration += delay
+                    delay = 0
+                elif isinstance(event, GraphicsControlExtension):
+                    duration += delay
+                    delay = event.delay * 10
+                elif isinstance(event, ApplicationExtension):
+                    if event.loop_count is not None:
+                        loop_count = event.loop_count
+                elif isinstance(event, LogicalScreenDescriptor):
+                    screen = event
+            if limit is None and cut and not parser.done:
+                limit = 'max_bytes'
+            if limit is not None or parser.done:
+                break
+            if expires is not None and time.monotonic() > expires:
+                limit = 'deadline'
+                break
+        if limit is None:
+            parser.close()
+        if limit != 'max_frames':
+            # A control block without a following image still counts towards the duration
+            duration += delay
         
-        self._headers_info['Logical Screen Descriptor'] = {
-            'Canvas Size': (f"{self._width}x{self._height}", 'Image dimensions'),
-            'Global Color Table': (global_color_table_flag, 'Whether global color table exists'),
-            'Color Resolution': (color_resolution, 'Bits per primary color'),
-            'Sort Flag': (sort_flag, 'Whether colors are sorted'),
-            'Color Table Size': (global_color_table_size, 'Number of entries in global color table'),
-            'Background Color': (background_color, 'Background color index'),
-            'Aspect Ratio': (aspect_ratio, 'Pixel aspect ratio')
+        if limit is None and parser.truncated:
+            limit = 'incomplete'
+        return {
+            'width': screen.width if screen else 0,
+            'height': screen.height if screen else 0,
+            'frame_count': frame_count,
+            'loop_count': loop_count,
+            'duration_ms': duration,
+            'file_size': size if size is not None else parser.offset,
+            'bytes_scanned': parser.offset,
+            'truncated': limit is not None,
+            'limit': limit
         }
+    
+    def _parse_chunks(self, chunks: Iterable[bytes | bytearray | memoryview | mmap.mmap], count_size: bool = False) -> None:
+        stats = self._stats
+        if stats is not None:
+            chunks = self._count_reads(chunks)
+            self._mark = time.perf_counter()
         
-        self._global_color_table_flag = global_color_table_flag
-        self._global_color_table_size = global_color_table_size
-    
-    def _parse_global_color_table(self, f: BinaryIO) -> None:
-        if self._global_color_table_flag:
-            table_size = self._global_color_table_size * 3
-            color_table = f.read(table_size)
-            
-            for i in range(0, table_size, 3):
-                r, g, b = color_table[i:i+3]
-                self._global_color_table.append((r, g, b))
-    
-    def _parse_frames(self, f: BinaryIO) -> None:
-        current_frame_data = None
-        
-        while True:
-            try:
-                block_type = f.read(1)
-                if not block_type:
-                    break
-                    
-                if block_type == self.IMAGE_SEPARATOR:
-                    current_frame_data = self._parse_image_descriptor(f)
-                    if current_frame_data:
-                        self._frames_info.append(current_frame_data)
-                        self._frame_count += 1
-                        
-                elif block_type == self.EXTENSION_INTRODUCER:
-                    extension_type = f.read(1)
-                    if extension_type == self.GRAPHICS_CONTROL_LABEL:
-                        if current_frame_data is None:
-                            current_frame_data = {}
-                        self._parse_graphics_control_extension(f, current_frame_data)
-                    elif extension_type == self.APPLICATION_LABEL:
-                        self._parse_application_extension(f)
-                    elif extension_type == self.COMMENT_LABEL:
-                        self._parse_comment_extension(f)
-                    self._skip_data_blocks(f)
-                elif block_type == self.TRAILER:
+        parser = self._stream = GifStreamParser(blocks=self._blocks)
+        try:
+            for chunk in chunks:
+                for event in parser.feed(chunk):
+                    self._handle_event(event)
+                if parser.done:
                     break
-            except Exception as e:
-                print(f"Error parsing frame: {str(e)}")
-                break
-    
-    def _parse_image_descriptor(self, f: BinaryIO) -> dict[str, tuple[int, int] | str | bool | int]:
-        left, top, width, height = struct.unpack("<HHHH", f.read(8))
-        packed = struct.unpack("<B", f.read(1))[0]
+            parser.close()
+        finally:
+            self._stream = None
         
-        local_color_table_flag = bool(packed & 0b10000000)
-        interlace_flag = bool(packed & 0b01000000)
-        sort_flag = bool(packed & 0b00100000)
-        local_color_table_size = 2 << (packed & 0b00000111)
+        # Image blocks are recorded once complete, so a truncated last frame keeps no length
+        blocks = self._blocks
+        lengths = compress(blocks[3::4], (block_type == IMAGE_SEPARATOR for block_type in blocks[0::4]))
+        for frame, length in zip(self._frames, lengths):
+            frame.length = length
         
-        frame_info = {
-            'Position': (left, top),
-            'Size': f"{width}x{height}",
-            'Local Color Table': local_color_table_flag,
-            'Interlaced': interlace_flag,
-            'Sort Flag': sort_flag,
-            'Color Table Size': local_color_table_size
-        }
+        if stats is not None:
+            self._lap('frames')
+            stats.sub_blocks += parser.sub_blocks
+            # A truncated last frame has no complete block, but its descriptor was read
+            stats.images += len(self._frames)
+            for i in range(0, len(blocks), 4):
+                if blocks[i] == EXTENSION_INTRODUCER:
+                    name = EXTENSION_NAMES.get(blocks[i + 1], f"0x{blocks[i + 1]:02X}")
+                    stats.extensions[name] = stats.extensions.get(name, 0) + 1
         
-        if local_color_table_flag:
-            f.seek(3 * local_color_table_size, 1)
-            
-        f.read(1)
-        self._skip_data_blocks(f)
-        return frame_info
-    
-    def _parse_graphics_control_extension(self, f: BinaryIO, frame_info: dict[str, str | int | bool | None]) -> None:
-        f.read(1)
-        packed = struct.unpack("<B", f.read(1))[0]
-        delay_time = struct.unpack("<H", f.read(2))[0]
-        transparent_color_index = struct.unpack("<B", f.read(1))[0]
+        if count_size:
+            self._file_size = parser.offset
+        if self._comment:
+            self._headers_info['Metadata']['Comment'] = (''.join(self._comment), 'GIF comment data')
+    
+    def _count_reads(self, chunks: Iterable[bytes | bytearray | memoryview | mmap.mmap]) -> Iterator[bytes | bytearray | memoryview | mmap.mmap]:
+        stats = self._stats
+        for chunk in chunks:
+            stats.read_calls += 1
+            stats.bytes_read += len(chunk)
+            yield chunk
+    
+    def _lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        timings = self._stats.timings
+        timings[phase] = timings.get(phase, 0.0) + now - self._mark
+        self._mark = now
+    
+    def _handle_event(self, event: Event) -> None:
+        if isinstance(event, ImageDescriptor):
+            self._parse_image_descriptor(event)
+        elif isinstance(event, GraphicsControlExtension):
+            self._pending_control = event
+            self._pending_control_offset = self._stream.block_offset
+            self._total_duration += event.delay * 10
+        elif isinstance(event, ApplicationExtension):
+            if event.loop_count is not None:
+                self._loop_count = event.loop_count
+                self._headers_info.setdefault('Metadata', {})['Loop Count'] = (event.loop_count, 'Number of animation iterations (0 = infinite)')
+        elif isinstance(event, CommentExtension):
+            self._parse_comment_extension(event)
+        elif isinstance(event, ScreenDescriptorRead):
+            if self._stats is not None:
+                self._lap('screen_descriptor')
+        elif isinstance(event, LogicalScreenDescriptor):
+            self._parse_logical_screen_descriptor(event)
+        elif isinstance(event, Header):
+            if self._stats is not None:
+                self._lap('header')
+            self._headers_info['Header'] = {
+                'Signature': (event.signature, 'GIF signature'),
+                'Version': (event.version, 'GIF version')
+            }
+    
+    def _parse_logical_screen_descriptor(self, event: LogicalScreenDescriptor) -> None:
+        if self._stats is not None:
+            self._lap('global_color_table')
+        self._width, self._height = event.width, event.height
+        self._screen = event
         
-        disposal_method = (packed & 0b00011100) >> 2
-        user_input_flag = bool(packed & 0b00000010)
-        transparency_flag = bool(packed & 0b00000001)
+        self._headers_info['Logical Screen Descriptor'] = {
+            'Canvas Size': (f"{self._width}x{self._height}", 'Image dimensions'),
+            'Global Color Table': (event.global_color_table_flag, 'Whether global color table exists'),
+            'Color Resolution': (event.color_resolution, 'Bits per primary color'),
+            'Sort Flag': (event.sort_flag, 'Whether colors are sorted'),
+            'Color Table Size': (event.color_table_size, 'Number of entries in global color table'),
+            'Background Color': (event.background_color, 'Background color index'),
+            'Aspect Ratio': (event.aspect_ratio, 'Pixel aspect ratio')
+        }
         
-        disposal_methods = [
-            "No disposal specified",
-            "Do not dispose",
-            "Restore to background",
-            "Restore to previous"
-        ]
+        if self._stats is not None:
+            self._lap('screen_descriptor')
+    
+    def _parse_image_descriptor(self, event: ImageDescriptor) -> None:
+        offset = self._stream.block_offset
+        local_color_table = event.local_color_table_flag
+        data_offset = offset + IMAGE_DESCRIPTOR_SIZE + (3 * event.color_table_size if local_color_table else 0)
         
-        delay_ms = delay_time * 10
-        self._total_duration += delay_ms
+        table = event.local_color_table
+        color_table_id = None
+        if table is not None:
+            color_table_id = self._color_table_ids.get(table)
+            if color_table_id is None:
+                color_table_id = self._color_table_ids[table] = len(self._color_tables)
+                self._color_tables.append(table)
         
-        frame_info.update({
-            'Delay': f"{delay_ms}ms",
-            'Disposal Method': disposal_methods[disposal_method] if disposal_method < len(disposal_methods) else f"Unknown ({disposal_method})",
-            'User Input': user_input_flag,
-            'Transparency': transparency_flag,
-            'Transparent Color': transparent_color_index if transparency_flag else None
-        })
-    
-    def _parse_application_extension(self, f: BinaryIO) -> None:
-        block_size = struct.unpack("<B", f.read(1))[0]
-        app_data = f.read(block_size)
-        if app_data.startswith(b'NETSCAPE2.0'):
-            self._parse_netscape_extension(f)
+        # Records are built in one call; setting fields afterwards costs as much again
+        control = self._pending_control
+        if control is not None:
+            transparency = control.transparency
+            frame = FrameRecord(
+                event.left, event.top, event.width, event.height, local_color_table, event.interlaced,
+                event.sort_flag, event.color_table_size, control.delay * 10, control.disposal_method,
+                control.user_input, transparency, control.transparent_color_index if transparency else None,
+                offset, None, data_offset, self._pending_control_offset, color_table_id
+            )
+            self._pending_control = None
         else:
-            self._skip_data_blocks(f)
-    
-    def _parse_netscape_extension(self, f: BinaryIO) -> None:
-        while True:
-            block_size = struct.unpack("<B", f.read(1))[0]
-            if block_size == 0:
-                break
-            if block_size == 3:
-                f.read(1)
-                iterations = struct.unpack("<H", f.read(2))[0]
-                self._headers_info.setdefault('Metadata', {})['Loop Count'] = (iterations, 'Number of animation iterations (0 = infinite)')
-            else:
-                f.read(block_size)
-    
-    def _parse_comment_extension(self, f: BinaryIO) -> None:
-        comment = []
-        while True:
-            block_size = struct.unpack("<B", f.read(1))[0]
-            if block_size == 0:
-                break
-            comment.append(f.read(block_size).decode('ascii', errors='ignore'))
+            frame = FrameRecord(
+                event.left, event.top, event.width, event.height, local_color_table, event.interlaced,
+                event.sort_flag, event.color_table_size,
+                offset=offset, data_offset=data_offset, color_table_id=color_table_id
+            )
+        self._pending_control_offset = None
         
-        if comment:
-            self._headers_info.setdefault('Metadata', {})['Comment'] = (''.join(comment), 'GIF comment data')
+        self._frames.append(frame)
+        self._frame_count += 1
     
-    def _skip_data_blocks(self, f: BinaryIO) -> None:
-        while True:
-            block_size = f.read(1)
-            if not block_size or block_size == b'\x00':
-                break
-            f.seek(struct.unpack("<B", block_size)[0], 1)
+    def _parse_comment_extension(self, event: CommentExtension) -> None:
+        if not event.continued:
+            self._comment.clear()
+            self._headers_info.setdefault('Metadata', {})['Comment'] = ('', 'GIF comment data')
+        self._comment.append(event.data.decode('ascii', errors='ignore'))
     
     def _format_size(self, size_bytes):
         for unit in ['B', 'KB', 'MB']:
@@ -213,7 +424,89 @@ class GifParser:
             size_bytes /= 1024
         return f"{size_bytes:.1f} GB"
     
-    def get_info(self) -> dict[str, dict | list | tuple | int]:
+    @property
+    def frames(self) -> list[FrameRecord]:
+        return self._frames
+    
+    @property
+    def global_color_table(self) -> bytes | None:
+        return self._screen.global_color_table if self._screen else None
+    
+    @property
+    def color_tables(self) -> list[bytes]:
+        return self._color_tables
+    
+    def color_table(self, frame: FrameRecord) -> bytes | None:
+        if frame.color_table_id is not None:
+            return self._color_tables[frame.color_table_id]
+        return self.global_color_table
+    
+    @property
+    def blocks(self) -> list[BlockSpan]:
+        blocks = self._blocks
+        return [BlockSpan(*blocks[i:i + 4]) for i in range(0, len(blocks), 4)]
+    
+    def get_summary(self) -> dict[str, str | int | float | bool | None]:
+        header = self._headers_info.get('Header', {})
+        screen = self._screen
+        comment = self._headers_info.get('Metadata', {}).get('Comment')
+        return {
+            'signature': header['Signature'][0] if header else None,
+            'version': header['Version'][0] if header else None,
+            'width': self._width,
+            'height': self._height,
+            'frame_count': self._frame_count,
+            'file_size': self._file_size,
+            'duration_ms': self._total_duration,
+            'frame_rate': round(1000 * self._frame_count / self._total_duration, 3) if self._total_duration > 0 else None,
+            'loop_count': self._loop_count,
+            'global_color_table': screen.global_color_table_flag if screen else None,
+            'color_table_size': screen.color_table_size if screen else None,
+            'color_resolution': screen.color_resolution if screen else None,
+            'background_color': screen.background_color if screen else None,
+            'aspect_ratio': screen.aspect_ratio if screen else None,
+            'comment': comment[0] if comment else None
+        }
+    
+    def to_dict(self) -> dict[str, dict | list | int | None]:
+        screen = self._screen
+        return {
+            'width': self._width,
+            'height': self._height,
+            'file_size': self._file_size,
+            'duration': self._total_duration,
+            'loop_count': self._loop_count,
+            'screen': [getattr(screen, name) for name in SCREEN_FIELDS] if screen else None,
+            'global_color_table': screen.global_color_table.hex() if screen and screen.global_color_table else None,
+            'color_tables': [table.hex() for table in self._color_tables],
+            'headers': self._headers_info,
+            'frames': [frame_values(frame) for frame in self._frames],
+            'blocks': self._blocks.tolist()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict, file_path: Path | None = None) -> 'GifParser':
+        parser = cls(file_path)
+        parser._width = data['width']
+        parser._height = data['height']
+        parser._file_size = data['file_size']
+        parser._total_duration = data['duration']
+        parser._loop_count = data['loop_count']
+        if data['screen'] is not None:
+            table = data['global_color_table']
+            parser._screen = LogicalScreenDescriptor(*data['screen'], bytes.fromhex(table) if table else None)
+        parser._color_tables = [bytes.fromhex(table) for table in data['color_tables']]
+        parser._color_table_ids = {table: i for i, table in enumerate(parser._color_tables)}
+        parser._headers_info = {
+            section: {key: tuple(value) for key, value in items.items()}
+            for section, items in data['headers'].items()
+        }
+        parser._frames = [FrameRecord(*values) for values in data['frames']]
+        parser._frame_count = len(parser._frames)
+        parser._blocks = array('q', data['blocks'])
+        return parser
+    
+    def get_headers(self) -> dict[str, dict[str, tuple[str | int | bool, str]]]:
         summary = {
             'Summary': {
                 'Resolution': (f"{self._width}x{self._height}", 'Image dimensions'),
@@ -223,10 +516,17 @@ class GifParser:
                 'Frame Rate': (f"{1000 * self._frame_count / self._total_duration:.1f} FPS" if self._total_duration > 0 else "N/A", 'Average frame rate')
             }
         }
-        
-        return {
-            'headers': {**summary, **self._headers_info},
-            'frames': self._frames_info,
+        return {**summary, **self._headers_info}
+    
+    def get_info(self) -> dict[str, dict | list | tuple | int]:
+        if self._stats is not None:
+            self._mark = time.perf_counter()
+        info = {
+            'headers': self.get_headers(),
+            'frames': [frame.as_info() for frame in self._frames],
             'dimensions': (self._width, self._height),
             'frame_count': self._frame_count
         }
+        if self._stats is not None:
+            self._lap('report')
+        return info
@@ -0,0 +1,86 @@
+import time
+from collections import deque
+from typing import Callable, Sequence
+
+# Browsers play delays of 0 and 10 ms as 100 ms, and so does the viewer
+MIN_DELAY_MS = 20
+DEFAULT_DELAY_MS = 100
+# Falling further behind than this is a stall (a dragged window, a slow disk) and playback resumes from now
+MAX_LAG = 1.0
+FPS_WINDOW = 30
+
+class PlaybackClock:
+    def __init__(self, delays_ms: Sequence[int | None], loop_count: int | None = None, speed: float = 1.0,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.delays: list[float] = [
+            (delay if delay and delay >= MIN_DELAY_MS else DEFAULT_DELAY_MS) / 1000 for delay in delays_ms
+        ]
+        self.loop_count: int | None = loop_count
+        self.speed: float = speed
+        self.index: int = 0
+        self.iteration: int = 0
+        self.dropped: int = 0
+        self.finished: bool = False
+        self._clock: Callable[[], float] = clock
+        self._deadline: float = 0.0
+        self._shown: deque[float] = deque(maxlen=FPS_WINDOW)
+    
+    @property
+    def plays(self) -> int | None:
+        # The loop count is the number of iterations, 0 meaning forever; without one the animation plays once
+        if self.loop_count == 0:
+            return None
+        return self.loop_count or 1
+    
+    def start(self, index: int = 0) -> None:
+        if self.finished:
+            self.iteration = 0
+            self.dropped = 0
+            self.finished = False
+        now = self._clock()
+        self.index = index
+        self._deadline = now + self._delay(index)
+        self._shown.clear()
+        self._shown.append(now)
+    
+    def remaining(self) -> float:
+        return max(0.0, self._deadline - self._clock())
+    
+    def advance(self) -> int | None:
+        # Deadlines are added up from the start instead of measured from the last render, so render time never drifts
+        now = self._clock()
+        if now < self._deadline:
+            return self.index
+        if now - self._deadline > MAX_LAG:
+            self._deadline = now
+        
+        skipped = -1
+        plays = self.plays
+        while now >= self._deadline:
+            index = self.index + 1
+            if index == len(self.delays):
+                self.iteration += 1
+                if plays is not None and self.iteration >= plays:
+                    self.finished = True
+                    return None
+                index = 0
+            self.index = index
+            self._deadline += self._delay(index)
+            skipped += 1
+        
+        self.dropped += skipped
+        self._shown.append(now)
+        return self.index
+    
+    def measured_fps(self) -> float:
+        shown = self._shown
+        if len(shown) < 2 or shown[-1] <= shown[0]:
+            return 0.0
+        return (len(shown) - 1) / (shown[-1] - shown[0])
+    
+    def intended_fps(self) -> float:
+        total = sum(self.delays)
+        return len(self.delays) * self.speed / total if total else 0.0
+    
+    def _delay(self, index: int) -> float:
+        return self.delays[index] / self.speed
@@ -0,0 +1,217 @@
+import csv
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator, TextIO
+from gif_parser import GifParser, FrameRecord, FRAME_FIELDS, SCAN_FIELDS, frame_values
+
+COLOR_FIELDS: tuple[str, ...] = ('unique_colors', 'transparent_pixels')
+DIFF_FIELDS: tuple[str, ...] = ('duplicate_of', 'changed_left', 'changed_top', 'changed_width', 'changed_height', 'wasted_bytes')
+
+def diff_values(frame: dict) -> tuple:
+    changed = frame['changed'] or ('', '', '', '')
+    duplicate_of = frame['duplicate_of']
+    return ('' if duplicate_of is None else duplicate_of, *changed, frame['wasted_bytes'])
+
+def frame_dict(frame: FrameRecord) -> dict[str, int | bool | None]:
+    return dict(zip(FRAME_FIELDS, frame_values(frame)))
+
+def report_dict(parser: GifParser) -> dict:
+    report = {'summary': parser.get_summary(), 'frames': [frame_dict(frame) for frame in parser.frames]}
+    if parser.colors is not None:
+        report['colors'] = parser.colors
+    if parser.diff is not None:
+        report['diff'] = parser.diff
+    return report
+
+def iter_text_report(parser: GifParser) -> Iterator[str]:
+    yield "=== GIF Information ==="
+    for section, items in parser.get_headers().items():
+        yield f"\n{section}:"
+        for key, (value, description) in items.items():
+            yield f"{key}: {value} ({description})"
+    
+    yield "\n=== Frame Information ==="
+    for i, frame in enumerate(parser.frames, 1):
+        yield f"\nFrame {i}:"
+        for key, value in frame.as_info().items():
+            yield f"{key}: {value}"
+    
+    colors = parser.colors
+    if colors is not None:
+        yield "\n=== Color Statistics ==="
+        yield f"Palettes: {colors['palettes']}"
+        yield f"Unique Colors: {colors['unique_colors']}"
+        yield f"Transparency Coverage: {colors['transparency_coverage']:.2%}"
+        yield "Top Colors: " + ", ".join(f"{color} ({count})" for color, count in colors['top_colors'])
+        for frame in colors['frames']:
+            yield (f"Frame {frame['index'] + 1}: {frame['unique_colors']} colors, {frame['transparency_coverage']:.2%} transparent, top "
+                   + ", ".join(f"{color} ({count})" for color, count in frame['top_colors']))
+    
+    diff = parser.diff
+    if diff is not None:
+        yield "\n=== Frame Changes ==="
+        yield f"Duplicate Frames: {diff['duplicate_frames']}"
+        yield f"Unchanged Frames: {diff['unchanged_frames']}"
+        yield f"Wasted Bytes: {diff['wasted_bytes']} of {diff['encoded_bytes']} ({diff['wasted_ratio']:.2%})"
+        for frame in diff['frames']:
+            if frame['changed'] is None:
+                change = "no change"
+            else:
+                left, top, width, height = frame['changed']
+                change = f"changed {width}x{height} at ({left}, {top})"
+            if frame['duplicate_of'] is not None:
+                change += f", duplicate of frame {frame['duplicate_of'] + 1}"
+            yield f"Frame {frame['index'] + 1}: {change}, {frame['wasted_bytes']} bytes wasted"
+
+class ReportWriter(ABC):
+    def __init__(self, out: TextIO, batch: bool = False, summary: bool = False, colors: bool = False, diff: bool = False):
+        self._out: TextIO = out
+        self._batch: bool = batch
+        self._summary: bool = summary
+        self._colors: bool = colors
+        self._diff: bool = diff
+    
+    def begin(self) -> None:
+        pass
+    
+    @abstractmethod
+    def write(self, path: Path, parser: GifParser) -> None:
+        ...
+    
+    @abstractmethod
+    def write_summary(self, path: Path, summary: dict[str, int | bool | str | None]) -> None:
+        ...
+    
+    def error(self, path: Path, message: str) -> None:
+        pass
+    
+    def end(self) -> None:
+        pass
+
+class TextWriter(ReportWriter):
+    def write(self, path: Path, parser: GifParser) -> None:
+        out = self._out
+        if self._batch:
+            out.write(f"##### {path} #####\n")
+        for line in iter_text_report(parser):
+            out.write(line)
+            out.write("\n")
+        if self._batch:
+            out.write("\n")
+    
+    def write_summary(self, path: Path, summary: dict[str, int | bool | str | None]) -> None:
+        out = self._out
+        if self._batch:
+            out.write(f"##### {path} #####\n")
+        for key, value in summary.items():
+            out.write(f"{key}: {value}\n")
+        if self._batch:
+            out.write("\n")
+
+class JsonWriter(ReportWriter):
+    def __init__(self, out: TextIO, batch: bool = False, summary: bool = False, colors: bool = False, diff: bool = False):
+        super().__init__(out, batch, summary, colors, diff)
+        self._count: int = 0
+    
+    def begin(self) -> None:
+        if self._batch:
+            self._out.write("[\n")
+    
+    def write(self, path: Path, parser: GifParser) -> None:
+        out = self._out
+        self._separate()
+        out.write(f'{{"path": {json.dumps(str(path))}, "summary": {json.dumps(parser.get_summary())}, "frames": [')
+        for i, frame in enumerate(parser.frames):
+            out.write(",\n" if i else "\n")
+            out.write(json.dumps(frame_dict(frame)))
+        out.write("\n]" if parser.frames else "]")
+        if parser.colors is not None:
+            out.write(f', "colors": {json.dumps(parser.colors)}')
+        if parser.diff is not None:
+            out.write(f', "diff": {json.dumps(parser.diff)}')
+        out.write("}")
+    
+    def write_summary(self, path: Path, summary: dict[str, int | bool | str | None]) -> None:
+        self._separate()
+        self._out.write(json.dumps({'path': str(path), **summary}))
+    
+    def error(self, path: Path, message: str) -> None:
+        self._separate()
+        self._out.write(json.dumps({'path': str(path), 'error': message}))
+    
+    def end(self) -> None:
+        self._out.write("\n]\n" if self._batch else "\n")
+    
+    def _separate(self) -> None:
+        if self._count:
+            self._out.write(",\n")
+        self._count += 1
+
+class NdjsonWriter(ReportWriter):
+    def write(self, path: Path, parser: GifParser) -> None:
+        out = self._out
+        name = str(path)
+        out.write(json.dumps({'type': 'file', 'path': name, 'summary': parser.get_summary()}))
+        out.write("\n")
+        for i, frame in enumerate(parser.frames):
+            out.write(json.dumps({'type': 'frame', 'path': name, 'index': i, **frame_dict(frame)}))
+            out.write("\n")
+        if parser.colors is not None:
+            out.write(json.dumps({'type': 'colors', 'path': name, **parser.colors}))
+            out.write("\n")
+        if parser.diff is not None:
+            out.write(json.dumps({'type': 'diff', 'path': name, **parser.diff}))
+            out.write("\n")
+    
+    def write_summary(self, path: Path, summary: dict[str, int | bool | str | None]) -> None:
+        self._out.write(json.dumps({'type': 'summary', 'path': str(path), **summary}))
+        self._out.write("\n")
+    
+    def error(self, path: Path, message: str) -> None:
+        self._out.write(json.dumps({'type': 'error', 'path': str(path), 'error': message}))
+        self._out.write("\n")
+
+class CsvWriter(ReportWriter):
+    def __init__(self, out: TextIO, batch: bool = False, summary: bool = False, colors: bool = False, diff: bool = False):
+        super().__init__(out, batch, summary, colors, diff)
+        self._writer = csv.writer(out, lineterminator="\n")
+    
+    def begin(self) -> None:
+        if self._summary:
+            self._writer.writerow(('path',) + SCAN_FIELDS)
+        else:
+            self._writer.writerow(('path', 'index') + FRAME_FIELDS + (COLOR_FIELDS if self._colors else ()) + (DIFF_FIELDS if self._diff else ()))
+    
+    def write(self, path: Path, parser: GifParser) -> None:
+        name = str(path)
+        rows = (
+            (name, i, *('' if value is None else int(value) for value in frame_values(frame)))
+            for i, frame in enumerate(parser.frames)
+        )
+        if self._colors:
+            # Frames whose image data could not be decoded have no color columns
+            colors = parser.colors['frames'] if parser.colors else []
+            rows = (
+                row + ((colors[i]['unique_colors'], colors[i]['transparent_pixels']) if i < len(colors) else ('', ''))
+                for i, row in enumerate(rows)
+            )
+        if self._diff:
+            diff = parser.diff['frames'] if parser.diff else []
+            rows = (
+                row + (diff_values(diff[i]) if i < len(diff) else ('',) * len(DIFF_FIELDS))
+                for i, row in enumerate(rows)
+            )
+        self._writer.writerows(rows)
+    
+    def write_summary(self, path: Path, summary: dict[str, int | bool | str | None]) -> None:
+        self._writer.writerow(
+            (str(path), *('' if value is None else int(value) if isinstance(value, bool) else value for value in summary.values()))
+        )
+
+WRITERS: dict[str, type[ReportWriter]] = {
+    'text': TextWriter,
+    'json': JsonWriter,
+    'ndjson': NdjsonWriter,
+    'csv': CsvWriter
+}
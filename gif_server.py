@@ -0,0 +1,290 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Coroutine
+from urllib.parse import urlsplit, parse_qs
+from gif_parser import GifParser
+from gif_stream import GifFormatError
+
+READ_SIZE = 65536
+MAX_HEADER_SIZE = 16 * 1024
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed',
+    408: 'Request Timeout', 411: 'Length Required', 413: 'Payload Too Large', 422: 'Unprocessable Entity',
+    500: 'Internal Server Error', 503: 'Service Unavailable', 504: 'Gateway Timeout'
+}
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status: int = status
+
+def analyze_path(path: str) -> dict[str, dict | list | tuple | int]:
+    return GifParser(Path(path)).parse_file()
+
+def analyze_upload(upload: 'UploadStream') -> dict[str, dict | list | tuple | int]:
+    return GifParser().parse_stream(upload)
+
+class UploadStream:
+    # Body chunks written by the event loop are read by the parser thread as they arrive; None marks the end
+    def __init__(self):
+        self._chunks: queue.SimpleQueue[bytes | None] = queue.SimpleQueue()
+        self._pending: bytes = b''
+    
+    def write(self, data: bytes) -> None:
+        if data:
+            self._chunks.put(data)
+    
+    def close(self) -> None:
+        self._chunks.put(None)
+    
+    def read(self, size: int = -1) -> bytes:
+        if not self._pending:
+            chunk = self._chunks.get()
+            if chunk is None:
+                # Later reads see the end again
+                self._chunks.put(None)
+                return b''
+            self._pending = chunk
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+class AnalysisServer:
+    def __init__(self, root: Path | str = '.', workers: int = 4, processes: bool = False,
+                 max_concurrency: int = 4, max_queue: int = 64, timeout: float = 30.0,
+                 max_body: int = 64 * 1024 * 1024):
+        self.root: Path = Path(root).resolve()
+        self.timeout: float = timeout
+        self.max_queue: int = max_queue
+        self.max_body: int = max_body
+        # Forked workers would inherit the client socket open at the time and keep its connection from closing
+        self._executor: Executor = (ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) if processes
+                                    else ThreadPoolExecutor(workers, thread_name_prefix='gif-analyze'))
+        # Uploads are parsed while they arrive, which needs a thread sharing the stream with the event loop
+        self._upload_executor: Executor = ThreadPoolExecutor(workers, thread_name_prefix='gif-upload') if processes else self._executor
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._counters: dict[str, int] = dict.fromkeys(
+            ('queue_depth', 'active', 'completed', 'failed', 'rejected', 'timeouts'), 0
+        )
+    
+    def metrics(self) -> dict[str, int]:
+        return dict(self._counters)
+    
+    async def start(self, host: str = '127.0.0.1', port: int = 8765) -> asyncio.Server:
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_SIZE)
+    
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._upload_executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                status, body = 200, await self._dispatch(reader)
+            except HttpError as e:
+                status, body = e.status, {'error': str(e)}
+            except Exception as e:
+                status, body = 500, {'error': str(e)}
+            await self._respond(writer, status, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _dispatch(self, reader: asyncio.StreamReader) -> dict:
+        method, target, headers = await self._read_head(reader)
+        url = urlsplit(target)
+        
+        if url.path == '/metrics':
+            if method != 'GET':
+                raise HttpError(405, f"{method} not allowed")
+            return self.metrics()
+        if url.path != '/analyze':
+            raise HttpError(404, f"No route for {url.path}")
+        
+        if method == 'GET':
+            paths = parse_qs(url.query).get('path')
+            if not paths:
+                raise HttpError(400, "Missing path parameter")
+            return await self._analyze(self._executor, analyze_path, str(self._resolve(paths[0])))
+        if method == 'POST':
+            length = self._body_length(headers)
+            upload = UploadStream()
+            return await self._analyze(self._upload_executor, analyze_upload, upload, self._read_body(reader, length, upload))
+        raise HttpError(405, f"{method} not allowed")
+    
+    async def _read_head(self, reader: asyncio.StreamReader) -> tuple[str, str, dict[str, str]]:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.timeout)
+        except asyncio.TimeoutError:
+            raise HttpError(408, "Timed out reading the request") from None
+        except asyncio.LimitOverrunError:
+            raise HttpError(400, "Request header too large") from None
+        
+        request_line, *header_lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = request_line.split(' ', 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line") from None
+        
+        headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+        return method, target, headers
+    
+    def _body_length(self, headers: dict[str, str]) -> int | None:
+        # None is a chunked body; anything but a plain non-negative Content-Length is refused before reading
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            return None
+        if 'content-length' not in headers:
+            raise HttpError(411, "Content-Length or chunked transfer encoding required")
+        value = headers['content-length']
+        if not (value.isascii() and value.isdigit()):
+            raise HttpError(400, "Malformed Content-Length")
+        length = int(value)
+        if length > self.max_body:
+            raise HttpError(413, f"Upload larger than {self.max_body} bytes")
+        return length
+    
+    async def _read_body(self, reader: asyncio.StreamReader, length: int | None, out: UploadStream) -> None:
+        # The upload is handed to the parser as it arrives instead of being held in memory or spooled to disk
+        received = 0
+        try:
+            async with asyncio.timeout(self.timeout):
+                if length is None:
+                    while True:
+                        size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                        received += size
+                        if size < 0:
+                            raise HttpError(400, "Malformed chunk size")
+                        if received > self.max_body:
+                            raise HttpError(413, f"Upload larger than {self.max_body} bytes")
+                        if size == 0:
+                            await reader.readuntil(b'\r\n')
+                            return
+                        while size:
+                            chunk = await reader.readexactly(min(size, READ_SIZE))
+                            out.write(chunk)
+                            size -= len(chunk)
+                        await reader.readexactly(2)
+                
+                while length:
+                    chunk = await reader.read(min(length, READ_SIZE))
+                    if not chunk:
+                        raise HttpError(400, "Upload ended early")
+                    out.write(chunk)
+                    length -= len(chunk)
+        except asyncio.TimeoutError:
+            raise HttpError(408, "Timed out reading the upload") from None
+        except ValueError:
+            raise HttpError(400, "Malformed request body") from None
+        finally:
+            out.close()
+    
+    def _resolve(self, path: str) -> Path:
+        resolved = (self.root / path).resolve()
+        if not resolved.is_relative_to(self.root):
+            raise HttpError(403, f"{path} is outside the served directory")
+        if not resolved.is_file():
+            raise HttpError(404, f"File {path} not found")
+        return resolved
+    
+    async def _analyze(self, executor: Executor, func: Callable[[str | UploadStream], dict], source: str | UploadStream,
+                       body: Coroutine[None, None, None] | None = None) -> dict:
+        # body feeds an upload to the job, so the job starts first and consumes it as it arrives
+        counters = self._counters
+        if counters['queue_depth'] >= self.max_queue:
+            counters['rejected'] += 1
+            if body is not None:
+                body.close()
+            raise HttpError(503, "Too many pending requests")
+        
+        counters['queue_depth'] += 1
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            if body is not None:
+                body.close()
+            raise
+        finally:
+            counters['queue_depth'] -= 1
+        
+        counters['active'] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            job = executor.submit(func, source)
+        except BaseException:
+            self._finish()
+            if body is not None:
+                body.close()
+            raise
+        # A timed out job cannot be interrupted, so its slot is only given back once the job really ends
+        job.add_done_callback(lambda _: loop.is_closed() or loop.call_soon_threadsafe(self._finish))
+        try:
+            if body is not None:
+                await body
+            result = await asyncio.wait_for(asyncio.wrap_future(job), self.timeout)
+            counters['completed'] += 1
+            return result
+        except asyncio.TimeoutError:
+            counters['timeouts'] += 1
+            raise HttpError(504, "Analysis timed out") from None
+        except (GifFormatError, ValueError, OSError) as e:
+            counters['failed'] += 1
+            raise HttpError(422, str(e)) from e
+    
+    def _finish(self) -> None:
+        self._counters['active'] -= 1
+        self._semaphore.release()
+    
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: close\r\n\r\n".encode('latin-1')
+        )
+        writer.write(payload)
+        await writer.drain()
+
+async def serve(server: AnalysisServer, host: str, port: int) -> None:
+    listener = await server.start(host, port)
+    print(f"Serving on http://{host}:{port}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve GIF analysis over HTTP')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--root', type=Path, default=Path('.'), help='Directory GET /analyze?path= may read from')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='Number of analysis workers')
+    parser.add_argument('--processes', action='store_true', help='Analyze in worker processes instead of threads')
+    parser.add_argument('--max-concurrency', type=int, default=os.cpu_count() or 1, help='Analyses running at once')
+    parser.add_argument('--max-queue', type=int, default=64, help='Requests allowed to wait for a worker before 503')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Seconds allowed for reading a request and for its analysis')
+    parser.add_argument('--max-body', type=int, default=64 * 1024 * 1024, help='Largest accepted upload in bytes')
+    args = parser.parse_args()
+    
+    server = AnalysisServer(args.root, args.jobs, args.processes, args.max_concurrency, args.max_queue, args.timeout, args.max_body)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
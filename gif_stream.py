@@ -0,0 +1,378 @@
+import struct
+from array import array
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+
+_U16 = struct.Struct("<H")
+_SCREEN_DESCRIPTOR = struct.Struct("<HHBBB")
+_IMAGE_DESCRIPTOR = struct.Struct("<HHHHB")
+_GRAPHICS_CONTROL = struct.Struct("<BHB")
+
+IMAGE_SEPARATOR = 0x2C
+EXTENSION_INTRODUCER = 0x21
+TRAILER = 0x3B
+
+PLAIN_TEXT_LABEL = 0x01
+GRAPHICS_CONTROL_LABEL = 0xF9
+APPLICATION_LABEL = 0xFF
+COMMENT_LABEL = 0xFE
+
+SIGNATURES = (b'GIF87a', b'GIF89a')
+LOOP_EXTENSIONS = (b'NETSCAPE2.0', b'ANIMEXTS1.0')
+
+class GifFormatError(ValueError):
+    pass
+
+# Events are built for every block, and frozen dataclasses take several times longer to construct
+@dataclass(slots=True)
+class Header:
+    signature: str
+    version: str
+
+@dataclass(slots=True)
+class LogicalScreenDescriptor:
+    width: int
+    height: int
+    global_color_table_flag: bool
+    color_resolution: int
+    sort_flag: bool
+    color_table_size: int
+    background_color: int
+    aspect_ratio: int
+    global_color_table: bytes | None
+
+@dataclass(slots=True)
+class ScreenDescriptorRead:
+    # Marks the end of the screen descriptor, before its global color table of table_bytes is read
+    table_bytes: int
+
+@dataclass(slots=True)
+class GraphicsControlExtension:
+    disposal_method: int
+    user_input: bool
+    transparency: bool
+    delay: int
+    transparent_color_index: int
+
+@dataclass(slots=True)
+class ImageDescriptor:
+    left: int
+    top: int
+    width: int
+    height: int
+    local_color_table_flag: bool
+    interlaced: bool
+    sort_flag: bool
+    color_table_size: int
+    local_color_table: bytes | None
+    lzw_min_code_size: int
+
+@dataclass(slots=True)
+class ImageData:
+    data: bytes
+
+@dataclass(slots=True)
+class ApplicationExtension:
+    identifier: bytes
+    auth_code: bytes
+    loop_count: int | None
+
+@dataclass(slots=True)
+class CommentExtension:
+    data: bytes
+    continued: bool
+
+@dataclass(slots=True)
+class Trailer:
+    pass
+
+@dataclass(slots=True)
+class BlockSpan:
+    # block_type is the introducer byte, or 0 for the header, screen descriptor and global color table
+    block_type: int
+    label: int
+    offset: int
+    length: int
+
+Event = (Header | ScreenDescriptorRead | LogicalScreenDescriptor | GraphicsControlExtension | ImageDescriptor
+         | ImageData | ApplicationExtension | CommentExtension | Trailer)
+
+# Parser states
+_HEADER = 0
+_SCREEN = 1
+_GLOBAL_TABLE = 2
+_BLOCK = 3
+_DESCRIPTOR = 4
+_EXTENSION = 5
+_SUB_BLOCK = 6
+_SKIP = 7
+_DONE = 8
+
+# Sub-block handling modes
+_SKIP_DATA = 0
+_IMAGE = 1
+_APPLICATION = 2
+_COMMENT = 3
+
+class GifStreamParser:
+    def __init__(self, image_data: bool = False, blocks: array | None = None, body: bool = False):
+        self._image_data: bool = image_data
+        # Complete blocks are appended as flat BlockSpan fields (block type, label, offset, length)
+        self._blocks: array | None = blocks
+        # A body parser starts at a block introducer, e.g. on frame bytes located through an index
+        self._state: int = _BLOCK if body else _HEADER
+        self._block_type: int = 0
+        self._label: int = 0
+        self._block_offset: int = 0
+        self._pending: bytes = b''
+        self._offset: int = 0
+        self._skip: int = 0
+        self._mode: int = _SKIP_DATA
+        self._screen: tuple[int, ...] = ()
+        self._descriptor: tuple[int, ...] = ()
+        self._application: tuple[bytes, bytes] = (b'', b'')
+        self._loop_count: int | None = None
+        self._comment_started: bool = False
+        self._sub_blocks: int = 0
+    
+    @property
+    def offset(self) -> int:
+        return self._offset
+    
+    @property
+    def sub_blocks(self) -> int:
+        return self._sub_blocks
+    
+    @property
+    def block_offset(self) -> int:
+        return self._block_offset
+    
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+    
+    @property
+    def truncated(self) -> bool:
+        return self._state not in (_BLOCK, _DONE)
+    
+    def feed(self, data: bytes | bytearray | memoryview) -> Iterator[Event]:
+        # Returns the walker itself, so events are not passed through a second generator
+        if self._state == _DONE:
+            self._offset += len(data)
+            return iter(())
+        if self._pending:
+            data = self._pending + bytes(data)
+            self._pending = b''
+        return self._walk(data)
+    
+    def close(self) -> None:
+        if self._state <= _GLOBAL_TABLE:
+            raise GifFormatError("Truncated GIF header or logical screen descriptor")
+    
+    def _walk(self, data: bytes | bytearray | memoryview) -> Iterator[Event]:
+        view = memoryview(data)
+        pos = 0
+        end = len(view)
+        state = self._state
+        mode = self._mode
+        image_data = self._image_data
+        blocks = self._blocks
+        base = self._offset
+        sub_blocks = self._sub_blocks
+        
+        # States are tested roughly in order of frequency; every pass through the loop costs the tests before its state
+        try:
+            while pos < end:
+                if state == _SUB_BLOCK:
+                    size = view[pos]
+                    if size and mode == _SKIP_DATA:
+                        # Buffered sub-block chains are skipped in one tight loop, down to the terminator
+                        pos += size + 1
+                        sub_blocks += 1
+                        while pos < end:
+                            size = view[pos]
+                            if not size:
+                                break
+                            pos += size + 1
+                            sub_blocks += 1
+                        else:
+                            if pos > end:
+                                self._skip = pos - end
+                                pos = end
+                                state = _SKIP
+                            continue
+                    if size == 0:
+                        pos += 1
+                        state = _BLOCK
+                        if mode == _APPLICATION:
+                            yield ApplicationExtension(self._application[0], self._application[1], self._loop_count)
+                        if blocks is not None:
+                            blocks.extend((self._block_type, self._label, self._block_offset, base + pos - self._block_offset))
+                        continue
+                    if end - pos <= size:
+                        break
+                    block = view[pos + 1:pos + 1 + size]
+                    pos += 1 + size
+                    sub_blocks += 1
+                    if mode == _IMAGE:
+                        yield ImageData(bytes(block))
+                    elif mode == _COMMENT:
+                        yield CommentExtension(bytes(block), self._comment_started)
+                        self._comment_started = True
+                    elif size >= 3 and block[0] == 1 and self._application[0] + self._application[1] in LOOP_EXTENSIONS:
+                        self._loop_count = _U16.unpack_from(block, 1)[0]
+                
+                elif state == _BLOCK:
+                    block_type = view[pos]
+                    self._block_type = block_type
+                    self._label = 0
+                    self._block_offset = base + pos
+                    pos += 1
+                    if block_type == IMAGE_SEPARATOR:
+                        state = _DESCRIPTOR
+                    elif block_type == EXTENSION_INTRODUCER:
+                        state = _EXTENSION
+                    elif block_type == TRAILER:
+                        state = _DONE
+                        yield Trailer()
+                        if blocks is not None:
+                            blocks.extend((TRAILER, 0, self._block_offset, 1))
+                        break
+                
+                elif state == _DESCRIPTOR:
+                    # The descriptor, its local color table and the LZW minimum code size are taken in one step
+                    if end - pos < _IMAGE_DESCRIPTOR.size:
+                        break
+                    left, top, width, height, packed = _IMAGE_DESCRIPTOR.unpack_from(view, pos)
+                    local_color_table_flag = bool(packed & 0b10000000)
+                    color_table_size = 2 << (packed & 0b00000111)
+                    table_bytes = 3 * color_table_size if local_color_table_flag else 0
+                    table_start = pos + _IMAGE_DESCRIPTOR.size
+                    if end - table_start < table_bytes + 1:
+                        break
+                    local_color_table = bytes(view[table_start:table_start + table_bytes]) if local_color_table_flag else None
+                    lzw_min_code_size = view[table_start + table_bytes]
+                    pos = table_start + table_bytes + 1
+                    # Image data nobody asked for is skipped like any other data
+                    mode = _IMAGE if image_data else _SKIP_DATA
+                    state = _SUB_BLOCK
+                    yield ImageDescriptor(
+                        left, top, width, height,
+                        local_color_table_flag,
+                        bool(packed & 0b01000000),
+                        bool(packed & 0b00100000),
+                        color_table_size,
+                        local_color_table,
+                        lzw_min_code_size
+                    )
+                
+                elif state == _EXTENSION:
+                    if end - pos < 2:
+                        break
+                    label = view[pos]
+                    size = view[pos + 1]
+                    self._label = label
+                    if label == COMMENT_LABEL:
+                        pos += 1
+                        mode = _COMMENT
+                        self._comment_started = False
+                        state = _SUB_BLOCK
+                        continue
+                    if label not in (GRAPHICS_CONTROL_LABEL, APPLICATION_LABEL):
+                        pos += 1
+                        mode = _SKIP_DATA
+                        state = _SUB_BLOCK
+                        continue
+                    if end - pos < 2 + size:
+                        break
+                    block = view[pos + 2:pos + 2 + size]
+                    pos += 2 + size
+                    state = _SUB_BLOCK
+                    if label == GRAPHICS_CONTROL_LABEL:
+                        mode = _SKIP_DATA
+                        if size >= _GRAPHICS_CONTROL.size:
+                            packed, delay, transparent_color_index = _GRAPHICS_CONTROL.unpack_from(block)
+                            yield GraphicsControlExtension(
+                                (packed & 0b00011100) >> 2,
+                                bool(packed & 0b00000010),
+                                bool(packed & 0b00000001),
+                                delay,
+                                transparent_color_index
+                            )
+                    else:
+                        mode = _APPLICATION
+                        self._application = (bytes(block[:8]), bytes(block[8:11]))
+                        self._loop_count = None
+                
+                elif state == _SKIP:
+                    step = min(self._skip, end - pos)
+                    pos += step
+                    self._skip -= step
+                    if not self._skip:
+                        state = _SUB_BLOCK
+                
+                elif state == _HEADER:
+                    if end - pos < 6:
+                        break
+                    header = bytes(view[pos:pos + 6])
+                    if header not in SIGNATURES:
+                        raise GifFormatError(f"Not a GIF file: header {header!r}")
+                    pos += 6
+                    state = _SCREEN
+                    yield Header(header[:3].decode('ascii'), header[3:6].decode('ascii'))
+                
+                elif state == _SCREEN:
+                    if end - pos < _SCREEN_DESCRIPTOR.size:
+                        break
+                    self._screen = _SCREEN_DESCRIPTOR.unpack_from(view, pos)
+                    pos += _SCREEN_DESCRIPTOR.size
+                    state = _GLOBAL_TABLE
+                    packed = self._screen[2]
+                    yield ScreenDescriptorRead(3 * (2 << (packed & 0b00000111)) if packed & 0b10000000 else 0)
+                
+                elif state == _GLOBAL_TABLE:
+                    width, height, packed, background_color, aspect_ratio = self._screen
+                    global_color_table_flag = bool(packed & 0b10000000)
+                    color_table_size = 2 << (packed & 0b00000111)
+                    table_bytes = 3 * color_table_size if global_color_table_flag else 0
+                    if end - pos < table_bytes:
+                        break
+                    global_color_table = bytes(view[pos:pos + table_bytes]) if global_color_table_flag else None
+                    pos += table_bytes
+                    state = _BLOCK
+                    if blocks is not None:
+                        blocks.extend((0, 0, 0, base + pos))
+                    yield LogicalScreenDescriptor(
+                        width, height,
+                        global_color_table_flag,
+                        ((packed & 0b01110000) >> 4) + 1,
+                        bool(packed & 0b00001000),
+                        color_table_size,
+                        background_color,
+                        aspect_ratio,
+                        global_color_table
+                    )
+                
+                else:
+                    break
+        finally:
+            self._state = state
+            self._mode = mode
+            self._sub_blocks = sub_blocks
+            # Bytes after the trailer are counted; an incomplete block is kept for the next feed
+            if state == _DONE:
+                self._offset += end
+            else:
+                self._offset += pos
+                if pos < end:
+                    self._pending = bytes(view[pos:])
+            view.release()
+
+def iter_events(stream: BinaryIO, chunk_size: int = 65536, image_data: bool = False) -> Iterator[Event]:
+    parser = GifStreamParser(image_data)
+    while not parser.done:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield from parser.feed(chunk)
+    parser.close()
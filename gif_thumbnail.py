@@ -0,0 +1,88 @@
+import struct
+import time
+import zlib
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import BinaryIO
+import numpy as np
+from gif_compositor import GifCompositor
+from gif_parser import GifParser
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Color type 6 is 8-bit RGBA
+PNG_RGBA = 6
+SHEET_PADDING = 4
+
+@dataclass(slots=True)
+class ThumbnailResult:
+    width: int
+    height: int
+    canvas_width: int
+    canvas_height: int
+    frames: int
+    tiles: int
+    output_bytes: int
+    seconds: float
+    
+    def as_dict(self) -> dict[str, int | float]:
+        return asdict(self)
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+def write_png(out: BinaryIO, pixels: np.ndarray) -> int:
+    # Unfiltered RGBA scanlines: every row starts with filter type 0
+    height, width = pixels.shape[:2]
+    rows = np.zeros((height, width * 4 + 1), np.uint8)
+    rows[:, 1:] = pixels.reshape(height, width * 4)
+    data = (
+        PNG_SIGNATURE
+        + png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, PNG_RGBA, 0, 0, 0))
+        + png_chunk(b'IDAT', zlib.compress(rows.tobytes(), 6))
+        + png_chunk(b'IEND', b'')
+    )
+    out.write(data)
+    return len(data)
+
+def sheet_frames(total: int, count: int) -> list[int]:
+    # Evenly spaced frames, always including the first
+    count = min(total, count)
+    return sorted({i * total // count for i in range(count)}) if count else []
+
+def make_thumbnail(source: Path | str, out: BinaryIO, max_size: int = 160, frames: int = 1, columns: int = 4) -> ThumbnailResult:
+    # frames > 1 lays several frames out as a contact sheet of max_size tiles
+    start = time.perf_counter()
+    source = Path(source)
+    parser = GifParser(source)
+    parser.parse_file()
+    wanted = sheet_frames(len(parser.frames), frames)
+    if not wanted:
+        raise ValueError("GIF has no frames to preview")
+    
+    compositor = GifCompositor(source, max_size)
+    tiles = []
+    keep = set(wanted)
+    last = wanted[-1]
+    for composited in compositor.frames(copy=False):
+        if composited.index in keep:
+            tiles.append(composited.canvas.copy())
+        if composited.index >= last:
+            break
+    
+    if len(tiles) == 1:
+        sheet = tiles[0]
+    else:
+        height, width = tiles[0].shape[:2]
+        columns = max(1, min(columns, len(tiles)))
+        rows = -(-len(tiles) // columns)
+        sheet = np.zeros((rows * (height + SHEET_PADDING) - SHEET_PADDING, columns * (width + SHEET_PADDING) - SHEET_PADDING, 4), np.uint8)
+        for i, tile in enumerate(tiles):
+            top, left = (i // columns) * (height + SHEET_PADDING), (i % columns) * (width + SHEET_PADDING)
+            sheet[top:top + height, left:left + width] = tile
+    
+    output_bytes = write_png(out, sheet)
+    screen = compositor.screen
+    return ThumbnailResult(
+        sheet.shape[1], sheet.shape[0], screen.width, screen.height, len(parser.frames), len(tiles),
+        output_bytes, time.perf_counter() - start
+    )